@@ -1,3 +1,4 @@
+import os
 import sys
 import math
 import json
@@ -7,12 +8,14 @@ import moderngl
 from pathlib import Path
 
 from .config import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, GRID_W, GRID_H, CELL_PADDING, TICK, PREVIEW_TICK,
+    WINDOW_WIDTH, WINDOW_HEIGHT, GRID_W, GRID_H, GRID_SIZES, CELL_PADDING, TICK, PREVIEW_TICK,
+    MAX_CATCHUP_TICKS,
     THEME_COLORS, THEME_NAMES, RESOLUTIONS, DEFAULT_SETTINGS,
     load_settings, save_settings, to_byte_color
 )
 from .game import Snake
-from .renderer import Renderer
+from .replay import ReplayRecorder
+from .renderer import BLOOM_BLURS, MAX_BLOOM_LEVELS, Renderer
 from .input_handler import InputHandler
 from .audio_manager import AudioManager
 
@@ -31,6 +34,7 @@ class SnakeGameApp:
         self.is_transitioning = False
         self.acc = 0.0
         self.preview_acc = 0.0
+        self.redraw = True  # something changed since the last presented frame
         
         # Game State
         self.debug_mode = False
@@ -42,13 +46,29 @@ class SnakeGameApp:
         self.chroma_timer = 0.0
         self.CHROMA_SPIKE_DURATION = 0.5
         self.MAX_CHROMA_SPIKE = 0.15
+        # Menu preview wanders on its own stream, separate from any game RNG
+        self.preview_rng = random.Random()
         
+        # Board size
+        try:
+            self.grid_size_index = GRID_SIZES.index(tuple(self.settings["grid_size"]))
+        except ValueError:
+            self.grid_size_index = 0
+            self.settings["grid_size"] = GRID_SIZES[0]
+        self.grid_w, self.grid_h = self.settings["grid_size"]
+
         # Game Objects
-        self.snake = Snake(GRID_W, GRID_H)
-        self.preview_snake = Snake(GRID_W, GRID_H)
+        self.snake = Snake(self.grid_w, self.grid_h)
+        self.preview_snake = Snake(self.grid_w, self.grid_h)
         
-        self.save_file = Path(__file__).resolve().parent.parent / "savegame.json"
-        self.has_save = self.save_file.exists()
+        self.save_file = Path(__file__).resolve().parent.parent / "savegame.bin"
+        # JSON saves from older versions are still loaded if no binary save exists
+        self.legacy_save_file = self.save_file.with_name("savegame.json")
+        self.has_save = self.save_file.exists() or self.legacy_save_file.exists()
+
+        # Input log of the current game; None when it can't be replayed (loaded saves)
+        self.replay_recorder = None
+        self.highscore_replay_file = Path(__file__).resolve().parent.parent / "highscore.replay"
 
         # State
         self.state = "menu"  # menu, settings, playing, gameover, win, paused
@@ -64,12 +84,14 @@ class SnakeGameApp:
         self.settings_items = [
             ("shake_on_death", "Shake on Death"),
             ("resolution", "Resolution"),
+            ("grid_size", "Board Size"),
             ("fullscreen", "Fullscreen"),
             ("music_volume", "Music Volume"),
             ("sfx_volume", "SFX Volume"),
             ("vsync", "V-Sync"),
             ("bloom", "Bloom"),
-            ("use_kawase", "Kawase Bloom"),
+            ("bloom_blur", "Bloom Blur"),
+            ("bloom_levels", "Bloom Levels"),
             ("bloom_strength", "Bloom Strength"),
             ("bloom_radius", "Bloom Radius"),
             ("chroma_enabled", "Chromatic Aberr."),
@@ -95,8 +117,8 @@ class SnakeGameApp:
         self.apply_settings_to_renderer()
         
         # Game Objects
-        self.snake = Snake(GRID_W, GRID_H)
-        self.preview_snake = Snake(GRID_W, GRID_H)
+        self.snake = Snake(self.grid_w, self.grid_h)
+        self.preview_snake = Snake(self.grid_w, self.grid_h)
         
         # Start Music
         self.audio_manager.set_music_volume(self.settings["music_volume"])
@@ -104,14 +126,15 @@ class SnakeGameApp:
         self.audio_manager.play_music()
 
     def save_game(self):
-        data = {
-            "snake": self.snake.to_dict(),
-            "score": len(self.snake.segments) - 1,
-            "mode": self.settings["game_mode"],
-        }
+        # Write a temp file and rename it over the old save, so a crash
+        # mid-write can never leave a truncated savegame behind.
+        tmp_file = self.save_file.with_suffix(".tmp")
         try:
-            with open(self.save_file, "w") as f:
-                json.dump(data, f)
+            with open(tmp_file, "wb") as f:
+                f.write(self.snake.to_bytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.save_file)
             self.has_save = True
             if "Continue" not in self.menu_items:
                 self.menu_items.insert(0, "Continue")
@@ -120,17 +143,37 @@ class SnakeGameApp:
 
     def load_game(self):
         try:
-            with open(self.save_file, "r") as f:
-                data = json.load(f)
-            self.settings["game_mode"] = data.get("mode", "Classic")
-            self.snake = Snake(GRID_W, GRID_H, mode=self.settings["game_mode"])
-            self.snake.from_dict(data["snake"])
+            if self.save_file.exists():
+                with open(self.save_file, "rb") as f:
+                    data = f.read()
+                self.snake = Snake(self.grid_w, self.grid_h)
+                self.snake.from_bytes(data)
+                self.settings["game_mode"] = self.snake.mode
+            else:
+                # JSON saves predate configurable boards and are always GRID_W x GRID_H
+                with open(self.legacy_save_file, "r") as f:
+                    data = json.load(f)
+                self.settings["game_mode"] = data.get("mode", "Classic")
+                self.snake = Snake(GRID_W, GRID_H, mode=self.settings["game_mode"])
+                self.snake.from_dict(data["snake"])
+            # The save decides the board size
+            if (self.snake.grid_w, self.snake.grid_h) != (self.grid_w, self.grid_h):
+                self.settings["grid_size"] = (self.snake.grid_w, self.snake.grid_h)
+                self.apply_grid_size(new_game=False)
+            self.replay_recorder = None
             self.update_menu_text()
             return True
         except Exception as e:
             print(f"Error loading game: {e}")
             return False
 
+    def new_game(self):
+        """Start a fresh, seeded game and begin recording its replay."""
+        self.snake = Snake(
+            self.grid_w, self.grid_h, mode=self.settings["game_mode"], seed=random.getrandbits(64)
+        )
+        self.replay_recorder = ReplayRecorder(self.snake)
+
     def init_display(self):
         flags = pygame.OPENGL | pygame.DOUBLEBUF
         if self.settings["fullscreen"]:
@@ -148,7 +191,7 @@ class SnakeGameApp:
         self.ctx.viewport = (0, 0, w, h)
         
         self.renderer = Renderer(
-            self.ctx, GRID_W, GRID_H, CELL_PADDING, screen_size=self.settings["resolution"]
+            self.ctx, self.grid_w, self.grid_h, CELL_PADDING, screen_size=self.settings["resolution"]
         )
         self.update_menu_text()
 
@@ -163,15 +206,41 @@ class SnakeGameApp:
     def apply_display_mode(self):
         # Re-initialize display with new settings
         self.init_display()
+        # the new renderer starts from its own defaults
+        self.apply_settings_to_renderer()
+
+    def apply_grid_size(self, new_game=True):
+        """Switch the board to settings["grid_size"]."""
+        self.grid_w, self.grid_h = self.settings["grid_size"]
+        if tuple(self.settings["grid_size"]) in GRID_SIZES:
+            self.grid_size_index = GRID_SIZES.index(tuple(self.settings["grid_size"]))
+        self.renderer.set_grid_size(self.grid_w, self.grid_h)
+        self.preview_snake = Snake(self.grid_w, self.grid_h)
+        if new_game:
+            self.snake = Snake(self.grid_w, self.grid_h, mode=self.settings["game_mode"])
 
     def run(self):
         while self.running:
+            timeout = self.idle_timeout()
+            woken = None
+            if timeout != 0.0 and not self.redraw and not pygame.event.peek():
+                # Nothing animates: sleep until input arrives (or the next
+                # timed change is due) instead of redrawing at 60 Hz.
+                if timeout is None:
+                    event = pygame.event.wait()
+                else:
+                    event = pygame.event.wait(max(1, int(timeout * 1000)))
+                if event.type != pygame.NOEVENT:
+                    # handled ahead of the queue, so it keeps its place
+                    woken = event
+
             dt = self.clock.tick(60) / 1000.0
             if self.is_transitioning:
                 self.is_transitioning = False
                 dt = 0.0
 
-            self.acc += dt
+            if self.state == "playing":
+                self.acc += dt
             self.menu_anim += dt * 2.5
             
             if self.state in ("menu", "settings"):
@@ -179,26 +248,56 @@ class SnakeGameApp:
 
             if self.chroma_timer > 0:
                 self.chroma_timer -= dt
+            if self.shake_timer > 0:
+                self.shake_timer -= dt
 
-            self.handle_input()
+            self.handle_input(woken)
             self.update()
-            self.render()
+            # An animation that just ended (e.g. the shake/chroma timers ran
+            # out) still needs its settled frame presented before idling.
+            animating = self.idle_timeout() == 0.0
+            if self.redraw or animating or timeout == 0.0:
+                self.render()
+                self.redraw = False
 
         pygame.quit()
         sys.exit()
 
+    def idle_timeout(self):
+        """Seconds until the picture changes on its own.
+
+        0.0 means something animates every frame (gameplay, the pulsing
+        menu highlight, shake/chroma timers, the debug counters); None means
+        the last frame stays valid until the next input event.
+        """
+        if self.debug_mode or self.state in ("playing", "menu"):
+            return 0.0
+        if self.shake_timer > 0 or self.chroma_timer > 0:
+            return 0.0
+        if self.state == "settings":
+            # only the preview snake moves
+            return max(0.0, PREVIEW_TICK - self.preview_acc)
+        return None
+
     def apply_settings_to_renderer(self):
         """Pushes current settings values to the renderer."""
         self.renderer.bloom_enabled = self.settings["bloom"]
-        self.renderer.use_kawase = self.settings["use_kawase"]
+        self.renderer.bloom_blur = self.settings["bloom_blur"]
+        self.renderer.bloom_levels = self.settings["bloom_levels"]
         self.renderer.bloom_strength = self.settings["bloom_strength"]
         self.renderer.bloom_radius = self.settings["bloom_radius"]
         self.renderer.chroma_enabled = self.settings["chroma_enabled"]
         self.renderer.chroma_amount = self.settings["chroma_amount"]
         self.renderer.chroma_bias = self.settings["chroma_bias"]
 
-    def handle_input(self):
-        for ev in pygame.event.get():
+    def handle_input(self, first=None):
+        """Dispatch queued events; `first` is one already taken off the queue."""
+        events = pygame.event.get()
+        if first is not None:
+            events.insert(0, first)
+        for ev in events:
+            # any event (keys, window exposure, focus) may change the picture
+            self.redraw = True
             if ev.type == pygame.QUIT:
                 save_settings(self.settings)
                 self.running = False
@@ -256,8 +355,7 @@ class SnakeGameApp:
                     self.is_transitioning = True
                     self.audio_manager.play_sound("start")
             elif choice == "Start Game":
-                self.snake = Snake(GRID_W, GRID_H, mode=self.settings["game_mode"])
-                self.snake.reset()
+                self.new_game()
                 self.state = "playing"
                 self.acc = 0.0
                 self.is_transitioning = True
@@ -291,10 +389,12 @@ class SnakeGameApp:
             key, _ = self.settings_items[self.settings_index]
             
             # Toggles
-            if key in ("vsync", "bloom", "use_kawase", "shake_on_death", "fullscreen", "chroma_enabled") and action == "ENTER":
+            if key in ("vsync", "bloom", "shake_on_death", "fullscreen", "chroma_enabled") and action == "ENTER":
                 self.settings[key] = not self.settings[key]
                 if key in ("vsync", "fullscreen"):
                     self.apply_display_mode()
+                elif key in ("bloom", "chroma_enabled"):
+                    self.apply_settings_to_renderer()
                 save_settings(self.settings)
             
             # Theme Cycler
@@ -307,6 +407,28 @@ class SnakeGameApp:
                 self.settings[key] = THEME_NAMES[new_index]
                 save_settings(self.settings)
                 
+            # Bloom Blur Cycler
+            elif key == "bloom_blur":
+                current_index = BLOOM_BLURS.index(self.settings[key])
+                if action == "LEFT":
+                    new_index = (current_index - 1) % len(BLOOM_BLURS)
+                else:
+                    new_index = (current_index + 1) % len(BLOOM_BLURS)
+                self.settings[key] = BLOOM_BLURS[new_index]
+                self.apply_settings_to_renderer()
+                save_settings(self.settings)
+
+            # Bloom Levels (mips in the dual filter chain)
+            elif key == "bloom_levels":
+                if action == "LEFT":
+                    self.settings[key] = max(1, self.settings[key] - 1)
+                elif action == "RIGHT":
+                    self.settings[key] = min(MAX_BLOOM_LEVELS, self.settings[key] + 1)
+                else:
+                    self.settings[key] = DEFAULT_SETTINGS[key]
+                self.apply_settings_to_renderer()
+                save_settings(self.settings)
+
             # Resolution Cycler
             elif key == "resolution":
                 if action == "LEFT":
@@ -317,6 +439,16 @@ class SnakeGameApp:
                 self.settings["resolution"] = new_res
                 self.apply_display_mode()
                 save_settings(self.settings)
+
+            # Board Size Cycler
+            elif key == "grid_size":
+                if action == "LEFT":
+                    self.grid_size_index = (self.grid_size_index - 1) % len(GRID_SIZES)
+                else:
+                    self.grid_size_index = (self.grid_size_index + 1) % len(GRID_SIZES)
+                self.settings["grid_size"] = GRID_SIZES[self.grid_size_index]
+                self.apply_grid_size()
+                save_settings(self.settings)
                 
             # Sliders
             elif key in (
@@ -363,7 +495,7 @@ class SnakeGameApp:
 
     def handle_gameover_input(self, action):
         if action == "RETRY" or action == "ENTER":
-            self.snake.reset()
+            self.new_game()
             self.acc = 0.0
             self.is_transitioning = True
             self.state = "playing"
@@ -373,7 +505,7 @@ class SnakeGameApp:
 
     def handle_win_input(self, action):
         if action == "RETRY" or action == "ENTER":
-            self.snake.reset()
+            self.new_game()
             self.state = "playing"
         elif action == "MENU_QUIT" or action == "PAUSE":
             self.snake.reset()
@@ -405,25 +537,48 @@ class SnakeGameApp:
         if self.state in ("menu", "settings") and self.preview_acc >= PREVIEW_TICK:
             self.preview_acc -= PREVIEW_TICK
             self.update_preview_snake()
-
-        # Game Logic
-        if self.state == "playing" and self.acc >= TICK:
+            self.redraw = True
+
+        # Game Logic: fixed TICK steps, as many as the elapsed time calls for
+        steps = 0
+        while self.state == "playing" and self.acc >= TICK:
+            if steps == MAX_CATCHUP_TICKS:
+                # a long hitch; drop the backlog but keep the tick phase
+                self.acc %= TICK
+                break
+            steps += 1
             self.acc -= TICK
-            ate, died, won = self.snake.step()
-            if ate:
-                self.audio_manager.play_sound("apple")
-            if died:
-                self.state = "gameover"
-                self.audio_manager.play_sound("gameover")
-                self.shake_timer = self.shake_duration if self.settings["shake_on_death"] else 0.0
-                self.chroma_timer = self.CHROMA_SPIKE_DURATION
-                final_score = max(0, len(self.snake.positions()) - 1)
-                if final_score > self.settings["high_score"]:
-                    self.settings["high_score"] = final_score
-                    save_settings(self.settings)
-            elif won:
-                self.state = "win"
-                self.audio_manager.play_sound("win")
+            self.redraw = True
+            self.step_game()
+
+    def step_game(self):
+        if self.replay_recorder:
+            self.replay_recorder.tick(self.snake)
+        ate, died, won = self.snake.step()
+        if ate:
+            self.audio_manager.play_sound("apple")
+        if died:
+            self.state = "gameover"
+            self.audio_manager.play_sound("gameover")
+            self.shake_timer = self.shake_duration if self.settings["shake_on_death"] else 0.0
+            self.chroma_timer = self.CHROMA_SPIKE_DURATION
+            final_score = max(0, len(self.snake.positions()) - 1)
+            if final_score > self.settings["high_score"]:
+                self.settings["high_score"] = final_score
+                save_settings(self.settings)
+                self.save_highscore_replay("died")
+        elif won:
+            self.state = "win"
+            self.audio_manager.play_sound("win")
+
+    def save_highscore_replay(self, outcome):
+        """Keep the input log of a new high score so it can be verified later."""
+        if not self.replay_recorder:
+            return
+        try:
+            self.replay_recorder.finish(self.snake, outcome).save(self.highscore_replay_file)
+        except Exception as e:
+            print(f"Error saving replay: {e}")
 
     def update_preview_snake(self):
         head_pos = self.preview_snake.positions()[0]
@@ -447,11 +602,12 @@ class SnakeGameApp:
         if new_dir != (0, 0):
             self.preview_snake.change_dir(new_dir)
             
-        if random.random() < 0.08:
-            if random.random() < 0.5:
-                self.preview_snake.change_dir((random.choice([-1, 1]), 0))
+        rng = self.preview_rng
+        if rng.random() < 0.08:
+            if rng.random() < 0.5:
+                self.preview_snake.change_dir((rng.choice([-1, 1]), 0))
             else:
-                self.preview_snake.change_dir((0, random.choice([-1, 1])))
+                self.preview_snake.change_dir((0, rng.choice([-1, 1])))
                 
         ate, died, won = self.preview_snake.step()
         if died or won:
@@ -470,8 +626,8 @@ class SnakeGameApp:
         
         # Preview Render
         if self.state in ("menu", "settings"):
-            self.renderer.draw_border(2, color=(0.08, 0.08, 0.08, 1.0))
-            self.renderer.draw_border(1, color=border_col)
+            # theme ring over a dark 2-cell ring
+            self.renderer.draw_border_layers(((2, (0.08, 0.08, 0.08, 1.0)), (1, border_col)))
             self.renderer.draw_snake(self.preview_snake.positions(), color=snake_col, shake=0.0)
             self.renderer.draw_apple(self.preview_snake.apple, color=apple_col, shake=0.0)
             self.renderer.draw_vignette()
@@ -494,7 +650,6 @@ class SnakeGameApp:
 
         # Bloom + Present
         self.renderer.set_dirt("src/assets/dirt.jpg")
-        self.renderer.use_kawase = self.settings["use_kawase"]
         self.renderer.exposure = self.settings["exposure"]
         self.renderer.chroma_enabled = self.settings["chroma_enabled"]
         
@@ -572,6 +727,8 @@ class SnakeGameApp:
             
             if key == "color_theme":
                 val = self.settings[key]
+            elif key == "grid_size":
+                val = "{}x{}".format(*self.settings[key])
             elif key in ("music_volume", "sfx_volume"):
                 val = f"{int(self.settings[key] * 100)}%"
             else:
@@ -618,8 +775,8 @@ class SnakeGameApp:
                 self.renderer.draw_text(item, size, color=color, pos=((screen_w - text_w) // 2, base_y + i * 60))
 
     def render_gameplay(self, snake_col, apple_col, border_col):
-        self.renderer.draw_border(2, color=(0.08, 0.08, 0.08, 1.0))
-        self.renderer.draw_border(1, color=border_col)
+        # theme ring over a dark 2-cell ring
+        self.renderer.draw_border_layers(((2, (0.08, 0.08, 0.08, 1.0)), (1, border_col)))
         
         shake = 0.0
         if self.state == "gameover" and self.shake_timer > 0:
@@ -635,7 +792,15 @@ class SnakeGameApp:
         if self.state == "gameover" and self.shake_timer > 0:
             shake = 0.2 * (self.shake_timer / self.shake_duration)
             
-        self.renderer.draw_snake(self.snake.positions(), color=snake_col, shake=shake)
+        # Slide between the last two steps; frozen while paused, settled
+        # once the game is over
+        alpha = 1.0
+        if self.state in ("playing", "paused"):
+            alpha = min(1.0, self.acc / TICK)
+        self.renderer.draw_snake(
+            self.snake.positions(), color=snake_col, shake=shake,
+            alpha=alpha, last_tail=self.snake.last_tail,
+        )
         self.renderer.draw_obstacles(self.snake.obstacles, color=obstacle_col)
         self.renderer.draw_apple(self.snake.apple, color=apple_col, shake=shake)
         
@@ -677,3 +842,14 @@ class SnakeGameApp:
         debug_text = f"LAST ACTION: {self.input_handler.last_input_action}"
         self.renderer.draw_text(debug_text, debug_size, color=(255, 255, 255), pos=(pos_x, pos_y))
 
+        writes, skipped = self.renderer.uniform_stats()
+        uniform_text = f"UNIFORMS: {writes} SET / {skipped} SKIPPED"
+        self.renderer.draw_text(uniform_text, debug_size, color=(255, 255, 255), pos=(pos_x, pos_y - 75))
+
+        _, vram = self.renderer.vram_report()
+        vram_text = f"RENDER TARGETS: {vram / (1024 * 1024):.1f} MB"
+        self.renderer.draw_text(vram_text, debug_size, color=(255, 255, 255), pos=(pos_x, pos_y - 100))
+
+        bloom_text = f"BLOOM: {self.renderer.bloom_blurs} BLURRED / {self.renderer.bloom_reuses} REUSED"
+        self.renderer.draw_text(bloom_text, debug_size, color=(255, 255, 255), pos=(pos_x, pos_y - 125))
+
@@ -7,9 +7,16 @@ from typing import Tuple
 # -----------------------
 WINDOW_WIDTH, WINDOW_HEIGHT = 1920, 1080
 GRID_W, GRID_H = 24, 24
+# Selectable board sizes; GRID_W x GRID_H is the default
+GRID_SIZES = [
+    (24, 24), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256), (512, 512), (1024, 1024),
+]
 CELL_PADDING = 0.05
 TICK = 0.16
 PREVIEW_TICK = 0.16
+# Most game steps run in one frame to catch up after a hitch; time beyond
+# that is dropped so a long stall doesn't fast-forward the game
+MAX_CATCHUP_TICKS = 4
 
 # -----------------------
 # JOYSTICK CONFIG
@@ -75,7 +82,8 @@ RESOLUTIONS = [(1920, 1080)]
 DEFAULT_SETTINGS = {
     "vsync": True,
     "bloom": True,
-    "use_kawase": False,
+    "bloom_blur": "Gaussian",
+    "bloom_levels": 4,
     "shake_on_death": True,
     "bloom_strength": 0.9,
     "bloom_radius": 2.0,
@@ -85,6 +93,7 @@ DEFAULT_SETTINGS = {
     "sfx_volume": 0.5,
     "game_mode": "Classic",
     "resolution": list(RESOLUTIONS[0]),
+    "grid_size": [GRID_W, GRID_H],
     "chroma_enabled": True,
     "chroma_amount": 0.02,
     "chroma_bias": 1.0,
@@ -99,10 +108,14 @@ def load_settings():
     try:
         with open(SETTINGS_FILE, "r") as f:
             data = json.load(f)
+        # the old on/off Kawase toggle became the bloom_blur choice
+        if data.pop("use_kawase", False) and "bloom_blur" not in data:
+            data["bloom_blur"] = "Kawase"
         for k, v in DEFAULT_SETTINGS.items():
             if k not in data:
                 data[k] = v
         data["resolution"] = tuple(data["resolution"])
+        data["grid_size"] = tuple(data["grid_size"])
         return data
     except Exception:
         return DEFAULT_SETTINGS.copy()
@@ -112,6 +125,7 @@ def save_settings(s):
     try:
         out = dict(s)
         out["resolution"] = list(out["resolution"])
+        out["grid_size"] = list(out["grid_size"])
         with open(SETTINGS_FILE, "w") as f:
             json.dump(out, f, indent=2)
     except Exception:
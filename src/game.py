@@ -1,46 +1,306 @@
+import json
 import random
+import struct
+from array import array
+from collections import deque
+from collections.abc import Sequence
+
+import numpy as np
+
+# Occupancy grid cell values
+CELL_EMPTY = 0
+CELL_SNAKE = 1
+CELL_OBSTACLE = 2
+
+# Obstacles never spawn within this Manhattan distance of the head or apple
+OBSTACLE_CLEARANCE = 3
+
+# Unit directions; the index is the 2-bit code used by the binary formats
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+
+# -----------------------
+# BINARY SAVEGAME
+# -----------------------
+# Little-endian. Header, then n_segments (tail first) and n_obstacles cell
+# indices (u16, or u32 on boards over 65536 cells), then the RNG:
+#   kind u8 = RNG_RANDOM: version u8, 625 x u32 internal state,
+#                         has_gauss u8, gauss_next f64
+#   kind u8 = RNG_JSON:   length u32, rng_to_dict() as UTF-8 JSON
+# The free-cell order is not stored: saving sorts it, and loading rebuilds
+# it sorted, so the RNG continues exactly. Version 1 saves stored it after
+# the obstacles (n_free in the header) and still load.
+SAVE_MAGIC = b"SSSV"
+SAVE_VERSION = 2
+SAVE_MODES = ("Classic", "Arcade")
+_SAVE_HEADER = struct.Struct("<4sBBHHBBIII")
+_SAVE_HEADER_V1 = struct.Struct("<4sBBHHBBIIII")
+_RNG_RANDOM = struct.Struct("<B625IBd")
+RNG_RANDOM = 1
+RNG_JSON = 2
+
+
+def _park_cleared_cells(free, slot, end: int, w: int, h: int, centers) -> int:
+    """Move free cells near any of `centers` to the back of a free-cell list.
+
+    Every free cell within OBSTACLE_CLEARANCE (Manhattan, no wraparound) of a
+    center is swapped into free[new_end:end]; free[:new_end] is then exactly
+    the set of cells an obstacle may take. Returns new_end. The list order is
+    arbitrary anyway, so nothing needs to be restored afterwards.
+    """
+    r = OBSTACLE_CLEARANCE
+    for cx, cy in centers:
+        for y in range(max(0, cy - r), min(h, cy + r + 1)):
+            span = r - abs(y - cy)
+            for x in range(max(0, cx - span), min(w, cx + span + 1)):
+                idx = y * w + x
+                s = int(slot[idx])
+                if 0 <= s < end:
+                    end -= 1
+                    other = int(free[end])
+                    free[s] = other
+                    slot[other] = s
+                    free[end] = idx
+                    slot[idx] = end
+    return end
+
+
+class GeneratorRandom:
+    """random.Random-style facade over a numpy.random.Generator.
+
+    Snake only needs randrange(); this lets callers hand it a NumPy
+    Generator instead of a random.Random.
+    """
+
+    def __init__(self, generator: np.random.Generator):
+        self.generator = generator
+
+    def randrange(self, n: int) -> int:
+        return int(self.generator.integers(n))
+
+
+def make_rng(seed=None, rng=None):
+    """Resolve Snake's seed/rng arguments into an object with randrange()."""
+    if rng is not None:
+        if isinstance(rng, np.random.Generator):
+            return GeneratorRandom(rng)
+        return rng
+    return random.Random(seed)
+
+
+def _state_to_json(value):
+    # Bit generator states nest dicts of ints, but MT19937, Philox and
+    # SFC64 keep arrays in them too; those become {"ndarray", "dtype"} dicts.
+    if isinstance(value, dict):
+        return {k: _state_to_json(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        return {"ndarray": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _state_from_json(value):
+    if isinstance(value, dict):
+        if set(value) == {"ndarray", "dtype"}:
+            return np.array(value["ndarray"], dtype=value["dtype"])
+        return {k: _state_from_json(v) for k, v in value.items()}
+    return value
+
+
+def rng_to_dict(rng):
+    """JSON-friendly snapshot of a make_rng() result."""
+    if isinstance(rng, GeneratorRandom):
+        state = rng.generator.bit_generator.state
+        return {"kind": "numpy", "state": _state_to_json(state)}
+    version, internal, gauss_next = rng.getstate()
+    return {"kind": "random", "state": [version, list(internal), gauss_next]}
+
+
+def rng_from_dict(data):
+    if data["kind"] == "numpy":
+        state = _state_from_json(data["state"])
+        bit_generator = getattr(np.random, state["bit_generator"])()
+        bit_generator.state = state
+        return GeneratorRandom(np.random.Generator(bit_generator))
+    version, internal, gauss_next = data["state"]
+    rng = random.Random()
+    rng.setstate((version, tuple(internal), gauss_next))
+    return rng
+
+
+class SegmentView(Sequence):
+    """Read-only, zero-copy view over a snake's segments (tail first, head last).
+
+    Stays valid for the lifetime of the Snake, including across reset() and
+    from_dict(), so callers may hold on to it between frames.
+
+    `pushes` counts heads added since the segments were last replaced
+    wholesale (the starting segments count too), and `epoch` changes on every
+    such replacement. Together they let a consumer that saw the view before
+    pick up only the new heads: the segment at index i was push number
+    pushes - len(view) + i.
+    """
+
+    __slots__ = ("_segments", "pushes", "epoch")
+
+    def __init__(self, segments: deque):
+        self._segments = segments
+        self.pushes = len(segments)
+        self.epoch = 0
+
+    def _restart(self) -> None:
+        self.pushes = len(self._segments)
+        self.epoch += 1
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def __iter__(self):
+        return iter(self._segments)
+
+    def __reversed__(self):
+        return reversed(self._segments)
+
+    def __contains__(self, p) -> bool:
+        return p in self._segments
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            # deque has no slicing; this is the only path that copies
+            return list(self._segments)[i]
+        return self._segments[i]
+
+    def __repr__(self) -> str:
+        return f"SegmentView({list(self._segments)!r})"
 
 
 class Snake:
-    """Encapsulates snake state and game rules."""
+    """Encapsulates snake state and game rules.
+
+    All randomness (apples, obstacles) comes from the instance's own RNG:
+    pass `seed` for a fresh random.Random(seed), or `rng` to supply a
+    random.Random or numpy.random.Generator. With neither, the RNG is seeded
+    from system entropy. The RNG state is part of to_dict()/from_dict(), so a
+    restored game continues exactly as the original would have.
+    """
 
-    def __init__(self, grid_w: int, grid_h: int, mode: str = "Classic"):
+    def __init__(
+        self, grid_w: int, grid_h: int, mode: str = "Classic", seed=None, rng=None
+    ):
         self.grid_w = grid_w
         self.grid_h = grid_h
         self.mode = mode
+        self.seed = seed
+        self.rng = make_rng(seed, rng)
         self.obstacles = set()
+        # Segments are stored tail first; both ends change every tick, so a
+        # deque keeps push/pop O(1). The store is mutated in place so that
+        # the view handed out by positions() never goes stale.
+        self.segments = deque()
+        self._view = SegmentView(self.segments)
+        # Flat grid_w * grid_h occupancy map kept in sync with segments/obstacles,
+        # so collision and placement checks don't scan the segment list.
+        self.grid = bytearray(grid_w * grid_h)
+        # Free-cell index: every empty cell index lives somewhere in _free and
+        # _free_slot maps cell index -> position in _free (-1 when occupied).
+        # Removal swaps with the last entry, so add/remove/sample are all O(1).
+        self._free = array("i")
+        self._free_slot = array("i", [-1]) * (grid_w * grid_h)
         self.reset()
 
     def reset(self) -> None:
-        self.segments = [(self.grid_w // 2, self.grid_h // 2)]
+        self.segments.clear()
+        self.segments.append((self.grid_w // 2, self.grid_h // 2))
         self.direction = (1, 0)
         self.obstacles.clear()
+        self._rebuild_grid()
         self.apple = self._spawn_apple()
 
+    def cell_index(self, p: tuple) -> int:
+        return p[1] * self.grid_w + p[0]
+
+    def is_free(self, p: tuple) -> bool:
+        """True if no snake segment or obstacle occupies cell p."""
+        return self.grid[p[1] * self.grid_w + p[0]] == CELL_EMPTY
+
+    def free_cell_count(self) -> int:
+        return len(self._free)
+
+    def _rebuild_grid(self, free_order=None) -> None:
+        """Rebuild the occupancy grid and free-cell index from scratch.
+
+        `free_order` restores a saved free-cell order (see to_dict); it is
+        ignored unless it lists exactly the empty cells.
+        """
+        w = self.grid_w
+        self._load_cells(
+            np.fromiter((y * w + x for x, y in self.segments), np.int64, len(self.segments)),
+            np.fromiter((y * w + x for x, y in self.obstacles), np.int64, len(self.obstacles)),
+            free_order,
+        )
+
+    def _load_cells(self, segments, obstacles, free_order=None) -> None:
+        # Occupancy grid and free-cell index are written through NumPy views,
+        # which keeps resets and loads fast on boards with a million cells.
+        grid = np.frombuffer(self.grid, dtype=np.uint8)
+        grid[:] = CELL_EMPTY
+        grid[obstacles] = CELL_OBSTACLE
+        grid[segments] = CELL_SNAKE
+
+        free = np.flatnonzero(grid == CELL_EMPTY).astype(np.int32)
+        if free_order is not None and len(free_order) == len(free):
+            saved = np.asarray(free_order, dtype=np.int32)
+            if np.array_equal(np.sort(saved), free):
+                free = saved
+        slot = np.frombuffer(self._free_slot, dtype=np.int32)
+        slot[:] = -1
+        slot[free] = np.arange(len(free), dtype=np.int32)
+        self._free = array("i", free.tobytes())
+        # Segments were replaced wholesale; incremental consumers must resync
+        self._view._restart()
+        self.last_tail = None
+
+    def _sort_free(self) -> None:
+        """Put the free-cell index in ascending order, the order loads rebuild."""
+        free = np.sort(np.frombuffer(self._free, dtype=np.int32))
+        np.frombuffer(self._free_slot, dtype=np.int32)[free] = np.arange(len(free), dtype=np.int32)
+        self._free = array("i", free.tobytes())
+
+    def _free_add(self, idx: int) -> None:
+        self._free_slot[idx] = len(self._free)
+        self._free.append(idx)
+
+    def _free_remove(self, idx: int) -> None:
+        free = self._free
+        slot = self._free_slot
+        s = slot[idx]
+        last = free.pop()
+        if last != idx:
+            free[s] = last
+            slot[last] = s
+        slot[idx] = -1
+
     def _spawn_apple(self):
-        while True:
-            p = (random.randrange(self.grid_w), random.randrange(self.grid_h))
-            p = (random.randrange(self.grid_w), random.randrange(self.grid_h))
-            if p not in self.segments and p not in self.obstacles:
-                return p
+        # Uniform over all empty cells, one draw regardless of how full the board is
+        idx = self._free[self.rng.randrange(len(self._free))]
+        return (idx % self.grid_w, idx // self.grid_w)
 
     def _spawn_obstacle(self):
-        for _ in range(50): # Try 50 times to find a spot
-            p = (random.randrange(self.grid_w), random.randrange(self.grid_h))
-            # Don't spawn on snake, apple, or existing obstacles
-            # Also avoid spawning too close to the head to prevent cheap deaths
-            # And avoid spawning too close to the apple to prevent blocking it
-            head = self.segments[-1]
-            dist_head = abs(p[0] - head[0]) + abs(p[1] - head[1])
-            dist_apple = abs(p[0] - self.apple[0]) + abs(p[1] - self.apple[1])
-            
-            if (p not in self.segments and 
-                p != self.apple and 
-                p not in self.obstacles and 
-                dist_head > 3 and 
-                dist_apple > 3):
-                self.obstacles.add(p)
-                return
+        # Don't spawn on snake, apple, or existing obstacles
+        # Also avoid spawning too close to the head to prevent cheap deaths
+        # And avoid spawning too close to the apple to prevent blocking it
+        end = _park_cleared_cells(
+            self._free, self._free_slot, len(self._free),
+            self.grid_w, self.grid_h, (self.segments[-1], self.apple),
+        )
+        if end == 0:
+            return  # no legal cell left anywhere on the board
+
+        idx = self._free[self.rng.randrange(end)]
+        self._free_remove(idx)
+        self.grid[idx] = CELL_OBSTACLE
+        self.obstacles.add((idx % self.grid_w, idx // self.grid_w))
 
     def change_dir(self, new_dir: tuple) -> None:
         # Prevent reversing direction
@@ -62,11 +322,19 @@ class Snake:
         # Initialize the flag to avoid NameError later
         ate = False
 
-        if new_head in self.segments or new_head in self.obstacles:
+        # The tail still occupies its cell at this point, so moving into it is fatal
+        new_idx = new_head[1] * self.grid_w + new_head[0]
+        if self.grid[new_idx] != CELL_EMPTY:
             #self.reset()
             return (False, True, False)  # Died
 
         self.segments.append(new_head)
+        self._view.pushes += 1
+        self.grid[new_idx] = CELL_SNAKE
+        self._free_remove(new_idx)
+        # Cell the tail left this step (None while growing), for renderers
+        # that slide segments between ticks
+        self.last_tail = None
 
         # Check if apple was eaten
         if new_head == self.apple:
@@ -88,26 +356,336 @@ class Snake:
         # move forward (drop tail)
         # Only drop the tail if an apple was NOT eaten.
         if not ate:
-            self.segments.pop(0)
+            tail = self.segments.popleft()
+            tail_idx = tail[1] * self.grid_w + tail[0]
+            self.grid[tail_idx] = CELL_EMPTY
+            self._free_add(tail_idx)
+            self.last_tail = tail
 
         # If reached this point, the game is still running (not died, not won)
         return (ate, False, False)
 
-    def positions(self):
-        return list(self.segments)
+    def positions(self) -> SegmentView:
+        """Read-only view of the segments; no copy is made."""
+        return self._view
 
     def to_dict(self):
         return {
-            "segments": self.segments,
+            "segments": list(self.segments),
             "direction": self.direction,
             "apple": self.apple,
             "mode": self.mode,
             "obstacles": list(self.obstacles),
+            "rng": rng_to_dict(self.rng),
+            # Which empty cell a given RNG draw lands on depends on this order
+            "free": list(self._free),
         }
 
     def from_dict(self, data):
-        self.segments = [tuple(p) for p in data["segments"]]
+        self.segments.clear()
+        self.segments.extend(tuple(p) for p in data["segments"])
         self.direction = tuple(data["direction"])
         self.apple = tuple(data["apple"])
         self.mode = data.get("mode", "Classic")
         self.obstacles = set(tuple(p) for p in data.get("obstacles", []))
+        # Older saves carry no RNG state; they just keep this instance's RNG
+        if "rng" in data:
+            self.rng = rng_from_dict(data["rng"])
+        self._rebuild_grid(data.get("free"))
+
+    def to_bytes(self) -> bytes:
+        """Compact binary snapshot; the counterpart of from_bytes().
+
+        Sorts the free-cell index first (see SAVE_VERSION), so the size only
+        depends on the snake and obstacles, not on the board.
+        """
+        self._sort_free()
+        w = self.grid_w
+        cells = w * self.grid_h
+        dtype = "<u2" if cells <= 0x10000 else "<u4"
+        segments = np.fromiter(
+            (y * w + x for x, y in self.segments), dtype=dtype, count=len(self.segments)
+        )
+        obstacles = np.fromiter(
+            (y * w + x for x, y in self.obstacles), dtype=dtype, count=len(self.obstacles)
+        )
+        header = _SAVE_HEADER.pack(
+            SAVE_MAGIC,
+            SAVE_VERSION,
+            SAVE_MODES.index(self.mode),
+            w,
+            self.grid_h,
+            np.dtype(dtype).itemsize,
+            DIRECTION_CODES[tuple(self.direction)],
+            self.cell_index(self.apple),
+            len(segments),
+            len(obstacles),
+        )
+        if isinstance(self.rng, random.Random):
+            version, internal, gauss_next = self.rng.getstate()
+            rng = bytes([RNG_RANDOM]) + _RNG_RANDOM.pack(
+                version, *internal, gauss_next is not None, gauss_next or 0.0
+            )
+        else:
+            blob = json.dumps(rng_to_dict(self.rng)).encode()
+            rng = bytes([RNG_JSON]) + struct.pack("<I", len(blob)) + blob
+        return b"".join(
+            (header, segments.tobytes(), obstacles.tobytes(), rng)
+        )
+
+    def from_bytes(self, data: bytes) -> None:
+        """Load a to_bytes() snapshot, decoding straight into the internal arrays.
+
+        The board takes the snapshot's grid size if it differs from this one.
+        """
+        magic, version = struct.unpack_from("<4sB", data)
+        if magic != SAVE_MAGIC:
+            raise ValueError("Not a savegame")
+        if version == SAVE_VERSION:
+            (_, _, mode, w, h, index_size, direction, apple,
+             n_segments, n_obstacles) = _SAVE_HEADER.unpack_from(data)
+            n_free = 0
+            pos = _SAVE_HEADER.size
+        elif version == 1:
+            (_, _, mode, w, h, index_size, direction, apple,
+             n_segments, n_obstacles, n_free) = _SAVE_HEADER_V1.unpack_from(data)
+            pos = _SAVE_HEADER_V1.size
+        else:
+            raise ValueError(f"Unsupported savegame version {version}")
+
+        if (w, h) != (self.grid_w, self.grid_h):
+            self.grid_w, self.grid_h = w, h
+            self.grid = bytearray(w * h)
+            self._free_slot = array("i", [-1]) * (w * h)
+
+        dtype = "<u2" if index_size == 2 else "<u4"
+        segments = np.frombuffer(data, dtype=dtype, count=n_segments, offset=pos)
+        pos += n_segments * index_size
+        obstacles = np.frombuffer(data, dtype=dtype, count=n_obstacles, offset=pos)
+        pos += n_obstacles * index_size
+        free = np.frombuffer(data, dtype=dtype, count=n_free, offset=pos)
+        pos += n_free * index_size
+
+        self.mode = SAVE_MODES[mode]
+        self.direction = DIRECTIONS[direction]
+        self.apple = (apple % w, apple // w)
+        seg_x, seg_y = (segments % w).tolist(), (segments // w).tolist()
+        self.segments.clear()
+        self.segments.extend(zip(seg_x, seg_y))
+        self.obstacles = set(zip((obstacles % w).tolist(), (obstacles // w).tolist()))
+
+        self._load_cells(segments, obstacles, free)
+
+        kind = data[pos]
+        pos += 1
+        if kind == RNG_RANDOM:
+            fields = _RNG_RANDOM.unpack_from(data, pos)
+            version, internal = fields[0], fields[1:626]
+            gauss_next = fields[627] if fields[626] else None
+            self.rng = random.Random()
+            self.rng.setstate((version, internal, gauss_next))
+        else:
+            (length,) = struct.unpack_from("<I", data, pos)
+            self.rng = rng_from_dict(json.loads(data[pos + 4 : pos + 4 + length]))
+
+
+class BatchSnake:
+    """N independent Snake boards stepped together with NumPy.
+
+    Board i follows exactly the same rules as a Snake and, for the same seed
+    and the same direction inputs, produces the same apples, obstacles and
+    (ate, died, won) results as Snake(grid_w, grid_h, mode, seed=seeds[i]):
+    it draws from its own random.Random(seeds[i]) in the same order.
+
+    Boards are stored as flat cell indices (y * grid_w + x):
+      grid        (N, W*H) uint8   occupancy, CELL_* values
+      body        (N, W*H) int32   ring buffer of segments, head at body[b, head[b]]
+      head/length (N,)     int32
+      dx/dy       (N,)     int32   current direction
+      apple       (N,)     int32
+      free/slot   (N, W*H) int32   per-board free-cell index, same layout as Snake
+
+    Boards that die or win are frozen (done[b] is True) until reset() again.
+    """
+
+    def __init__(self, n: int, grid_w: int, grid_h: int, mode: str = "Classic", seeds=None):
+        self.n = n
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.mode = mode
+        cells = grid_w * grid_h
+        if seeds is None:
+            seeds = [random.getrandbits(64) for _ in range(n)]
+        if len(seeds) != n:
+            raise ValueError(f"expected {n} seeds, got {len(seeds)}")
+        self.rngs = [random.Random(seed) for seed in seeds]
+
+        self.grid = np.zeros((n, cells), dtype=np.uint8)
+        self.body = np.zeros((n, cells), dtype=np.int32)
+        self.head = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.dx = np.zeros(n, dtype=np.int32)
+        self.dy = np.zeros(n, dtype=np.int32)
+        self.apple = np.zeros(n, dtype=np.int32)
+        self.n_obstacles = np.zeros(n, dtype=np.int32)
+        self.free = np.zeros((n, cells), dtype=np.int32)
+        self.free_len = np.zeros(n, dtype=np.int32)
+        self.slot = np.full((n, cells), -1, dtype=np.int32)
+        self.done = np.zeros(n, dtype=bool)
+
+        # Free list of a freshly reset board: every cell but the start cell,
+        # in ascending order (matches Snake._rebuild_grid).
+        start = (grid_h // 2) * grid_w + grid_w // 2
+        self._start = start
+        self._reset_free = np.delete(np.arange(cells, dtype=np.int32), start)
+        self._reset_slot = np.empty(cells, dtype=np.int32)
+        self._reset_slot[self._reset_free] = np.arange(cells - 1, dtype=np.int32)
+        self._reset_slot[start] = -1
+
+        self.reset()
+
+    def reset(self, mask=None) -> None:
+        """Reset all boards, or only those where mask is True."""
+        b = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        cells = self.grid_w * self.grid_h
+        self.grid[b] = CELL_EMPTY
+        self.grid[b, self._start] = CELL_SNAKE
+        self.body[b, 0] = self._start
+        self.head[b] = 0
+        self.length[b] = 1
+        self.dx[b] = 1
+        self.dy[b] = 0
+        self.n_obstacles[b] = 0
+        self.free[b, : cells - 1] = self._reset_free
+        self.free_len[b] = cells - 1
+        self.slot[b] = self._reset_slot
+        self.done[b] = False
+        for i in b.tolist():
+            self.apple[i] = self._spawn_apple(i)
+
+    def change_dir(self, dirs, mask=None) -> None:
+        """Set new directions from an (N, 2) (or broadcastable (2,)) array.
+
+        Reversals are ignored per board, as in Snake.change_dir.
+        """
+        dirs = np.broadcast_to(np.asarray(dirs, dtype=np.int32), (self.n, 2))
+        ok = ~((dirs[:, 0] == -self.dx) & (dirs[:, 1] == -self.dy))
+        if mask is not None:
+            ok &= mask
+        self.dx[ok] = dirs[ok, 0]
+        self.dy[ok] = dirs[ok, 1]
+
+    def step(self):
+        """Advance every live board by one cell.
+
+        Returns boolean arrays (ate, died, won), each of shape (N,).
+        """
+        w, h = self.grid_w, self.grid_h
+        cells = w * h
+        ate = np.zeros(self.n, dtype=bool)
+        died = np.zeros(self.n, dtype=bool)
+        won = np.zeros(self.n, dtype=bool)
+
+        b = np.flatnonzero(~self.done)
+        head = self.body[b, self.head[b]]
+        new = ((head // w + self.dy[b]) % h) * w + (head % w + self.dx[b]) % w
+
+        # The tail still occupies its cell at this point, so moving into it is fatal
+        hit = self.grid[b, new] != CELL_EMPTY
+        died[b[hit]] = True
+        self.done[b[hit]] = True
+        b = b[~hit]
+        new = new[~hit]
+
+        pos = self.head[b] + 1
+        pos[pos == cells] = 0
+        self.head[b] = pos
+        self.body[b, pos] = new
+        self.length[b] += 1
+        self.grid[b, new] = CELL_SNAKE
+        self._free_remove(b, new)
+
+        eat = new == self.apple[b]
+        eaters = b[eat]
+        ate[eaters] = True
+        full = self.length[eaters] + self.n_obstacles[eaters] == cells
+        won[eaters[full]] = True
+        self.done[eaters[full]] = True
+
+        # Apple/obstacle spawns need each board's own RNG; they only happen
+        # on the (rare) ticks where a board eats.
+        arcade = self.mode == "Arcade"
+        for i in eaters[~full].tolist():
+            self.apple[i] = self._spawn_apple(i)
+            if arcade and (self.length[i] - 1) % 3 == 0:
+                self._spawn_obstacle(i)
+
+        movers = b[~eat]
+        tail_pos = self.head[movers] - self.length[movers] + 1
+        tail_pos[tail_pos < 0] += cells
+        tail = self.body[movers, tail_pos]
+        self.length[movers] -= 1
+        self.grid[movers, tail] = CELL_EMPTY
+        self._free_add(movers, tail)
+
+        return ate, died, won
+
+    def scores(self) -> np.ndarray:
+        return self.length - 1
+
+    def positions(self, i: int) -> list:
+        """Segments of board i as (x, y) tuples, tail first."""
+        n = int(self.length[i])
+        cells = self.grid_w * self.grid_h
+        idx = self.body[i, (self.head[i] - n + 1 + np.arange(n)) % cells]
+        return [(c % self.grid_w, c // self.grid_w) for c in idx.tolist()]
+
+    def to_dict(self, i: int):
+        """Board i in the same shape as Snake.to_dict()."""
+        w = self.grid_w
+        a = int(self.apple[i])
+        obstacles = np.flatnonzero(self.grid[i] == CELL_OBSTACLE).tolist()
+        return {
+            "segments": self.positions(i),
+            "direction": (int(self.dx[i]), int(self.dy[i])),
+            "apple": (a % w, a // w),
+            "mode": self.mode,
+            "obstacles": [(c % w, c // w) for c in obstacles],
+            "rng": rng_to_dict(self.rngs[i]),
+            "free": self.free[i, : self.free_len[i]].tolist(),
+        }
+
+    def _free_remove(self, b, cells) -> None:
+        # Vectorized Snake._free_remove; each board appears at most once in b
+        s = self.slot[b, cells]
+        n = self.free_len[b] - 1
+        last = self.free[b, n]
+        self.free[b, s] = last
+        self.slot[b, last] = s
+        self.slot[b, cells] = -1
+        self.free_len[b] = n
+
+    def _free_add(self, b, cells) -> None:
+        n = self.free_len[b]
+        self.free[b, n] = cells
+        self.slot[b, cells] = n
+        self.free_len[b] = n + 1
+
+    def _spawn_apple(self, i: int) -> int:
+        return int(self.free[i, self.rngs[i].randrange(int(self.free_len[i]))])
+
+    def _spawn_obstacle(self, i: int) -> None:
+        w = self.grid_w
+        head = int(self.body[i, self.head[i]])
+        apple = int(self.apple[i])
+        end = _park_cleared_cells(
+            self.free[i], self.slot[i], int(self.free_len[i]),
+            w, self.grid_h, ((head % w, head // w), (apple % w, apple // w)),
+        )
+        if end == 0:
+            return  # no legal cell left anywhere on the board
+
+        idx = int(self.free[i, self.rngs[i].randrange(end)])
+        self._free_remove(np.array([i]), np.array([idx]))
+        self.grid[i, idx] = CELL_OBSTACLE
+        self.n_obstacles[i] += 1
@@ -1,11 +1,216 @@
 from collections import OrderedDict
-from typing import List, Tuple
+from itertools import chain, islice
+from typing import Collection, List, Optional, Tuple
 import random
 import numpy as np
 import moderngl
 import pygame
 from pathlib import Path
 
+# Board instances are (x, y, prev x, prev y, palette index); quad.vert looks
+# the color up in u_palette, so every kind of cell shares one buffer and one
+# draw call. Cells are drawn at mix(prev, cell, u_alpha), which lets snake
+# segments slide between ticks; cells that don't move have prev == cell.
+INSTANCE_BYTES = 20
+PALETTE_SIZE = 8
+PALETTE_SNAKE = 0
+PALETTE_APPLE = 1
+PALETTE_OBSTACLE = 2
+MAX_BORDER_LAYERS = 4
+
+class UniformCache:
+    """Uniform writes for one program, skipping values that did not change.
+
+    Handles are resolved once; names the program does not have (never
+    declared, or optimized out by the driver) are ignored, as are all
+    writes when `prog` is None. `writes` and `skipped` count GL uniform
+    updates issued and avoided.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, prog):
+        self.prog = prog
+        self._handles = {}
+        self._values = {}
+        self.writes = 0
+        self.skipped = 0
+
+    def _handle(self, name: str):
+        handle = self._handles.get(name, self._MISSING)
+        if handle is self._MISSING:
+            handle = None
+            if self.prog is not None and name in self.prog:
+                handle = self.prog[name]
+            self._handles[name] = handle
+        return handle
+
+    def set(self, name: str, value):
+        handle = self._handle(name)
+        if handle is None:
+            return
+        if self._values.get(name, self._MISSING) == value:
+            self.skipped += 1
+            return
+        handle.value = value
+        self._values[name] = value
+        self.writes += 1
+
+    def write(self, name: str, data):
+        """Like set() for raw data (e.g. NumPy arrays for uniform arrays)."""
+        handle = self._handle(name)
+        if handle is None:
+            return
+        data = bytes(data)
+        if self._values.get(name) == data:
+            self.skipped += 1
+            return
+        handle.write(data)
+        self._values[name] = data
+        self.writes += 1
+
+
+# Text instances are (x, y, w, h) in pixels, atlas uv rect and RGBA color
+TEXT_INSTANCE_BYTES = 48
+# Rect instances are (x, y, w, h) in pixels, RGBA color and corner radius
+RECT_INSTANCE_BYTES = 36
+
+
+class GlyphAtlas:
+    """All printable ASCII glyphs of one font size packed into one texture.
+
+    Glyphs are rendered white into a single-channel coverage texture; color
+    is applied per instance when drawing. Strings are laid out with the
+    font's own measurements, so the result matches font.render() exactly,
+    kerning included.
+    """
+
+    CHARS = "".join(chr(c) for c in range(32, 127))
+
+    def __init__(self, ctx: moderngl.Context, font: pygame.font.Font, max_width: int = 1024):
+        self.font = font
+        self.height = font.get_height()
+
+        surfaces = [(ch, font.render(ch, True, (255, 255, 255))) for ch in self.CHARS]
+
+        # shelf packing, one pixel of padding so linear filtering never bleeds
+        places = []
+        x = y = 0
+        for ch, surf in surfaces:
+            w = surf.get_width()
+            if x + w + 1 > max_width:
+                x = 0
+                y += self.height + 1
+            places.append((x, y))
+            x += w + 1
+        atlas_w = max_width
+        atlas_h = y + self.height
+
+        coverage = np.zeros((atlas_h, atlas_w), dtype=np.uint8)
+        self.glyphs = {}
+        for (ch, surf), (gx, gy) in zip(surfaces, places):
+            w, h = surf.get_size()
+            alpha = pygame.surfarray.array_alpha(surf).T
+            coverage[gy : gy + h, gx : gx + w] = alpha
+            # (width, height, u0, v0, u1, v1, has ink); row 0 is the top
+            self.glyphs[ch] = (
+                w,
+                h,
+                gx / atlas_w,
+                gy / atlas_h,
+                (gx + w) / atlas_w,
+                (gy + h) / atlas_h,
+                bool(alpha.any()),
+            )
+
+        self.texture = ctx.texture((atlas_w, atlas_h), 1, coverage.tobytes())
+        self.texture.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        self._layouts = OrderedDict()
+
+    def supports(self, text: str) -> bool:
+        glyphs = self.glyphs
+        return all(ch in glyphs for ch in text)
+
+    def layout(self, text: str) -> np.ndarray:
+        """Per-glyph (dx, dy, w, h, u0, v0, u1, v1) rows relative to the text origin.
+
+        Layouts are cached (LRU) so redrawing a string costs no Python loop.
+        """
+        cached = self._layouts.get(text)
+        if cached is not None:
+            self._layouts.move_to_end(text)
+            return cached
+
+        size = self.font.size
+        rows = []
+        for i, ch in enumerate(text):
+            w, h, u0, v0, u1, v1, ink = self.glyphs[ch]
+            if not ink:
+                continue
+            # a glyph ends where the prefix it closes ends
+            x = size(text[: i + 1])[0] - w
+            rows.append((x, 0.0, w, h, u0, v0, u1, v1))
+        arr = np.array(rows, dtype="f4").reshape(-1, 8)
+
+        self._layouts[text] = arr
+        if len(self._layouts) > 256:
+            self._layouts.popitem(last=False)
+        return arr
+
+    def release(self):
+        self.texture.release()
+
+
+# Bytes per channel for the render target dtypes used below
+DTYPE_BYTES = {"f1": 1, "f2": 2, "f4": 4}
+
+# Blur used on the half-res bloom buffer
+BLOOM_BLURS = ("Gaussian", "Kawase", "Dual Filter")
+MAX_BLOOM_LEVELS = 8
+
+
+def render_target_plan(
+    size: Tuple[int, int], bloom: bool = True, chroma: bool = False, bloom_levels: int = 0
+):
+    """Offscreen targets the post pipeline needs: name -> (size, components, dtype).
+
+    The scene is always drawn offscreen. Bloom adds an HDR mask (half floats
+    are plenty for values a few times over 1.0) and a half-res buffer for the
+    bright pass. Kawase and Gaussian blurs ping-pong between it and a second
+    half-res buffer; with `bloom_levels` > 0 the dual filter instead walks a
+    chain of that many mips, each half the size of the one above. The
+    full-res "post" target only exists to feed a separate chromatic
+    aberration pass (`chroma`); otherwise the composite, fused with the
+    aberration or not, goes straight to the screen.
+    """
+    w, h = size
+    half = (max(1, w // 2), max(1, h // 2))
+    plan = {"scene": ((w, h), 4, "f1")}
+    if bloom:
+        plan["bloom"] = ((w, h), 4, "f2")
+        plan["bloom_ping"] = (half, 4, "f1")
+        if bloom_levels > 0:
+            for level in range(1, bloom_levels + 1):
+                mip = (max(1, half[0] >> level), max(1, half[1] >> level))
+                plan[f"bloom_mip{level}"] = (mip, 4, "f1")
+        else:
+            plan["bloom_pong"] = (half, 4, "f1")
+        if chroma:
+            plan["post"] = ((w, h), 4, "f1")
+    return plan
+
+
+def estimate_vram(
+    size: Tuple[int, int], bloom: bool = True, chroma: bool = False, bloom_levels: int = 0
+):
+    """Bytes of render targets at `size`: ({name: bytes}, total)."""
+    plan = render_target_plan(size, bloom, chroma, bloom_levels)
+    sizes = {
+        name: t_size[0] * t_size[1] * components * DTYPE_BYTES[dtype]
+        for name, (t_size, components, dtype) in plan.items()
+    }
+    return sizes, sum(sizes.values())
+
 
 class Renderer:
     def __init__(
@@ -39,6 +244,8 @@ class Renderer:
         vert_src = (self.shader_dir / "quad.vert").read_text()
         frag_src = (self.shader_dir / "quad.frag").read_text()
         self.prog = ctx.program(vertex_shader=vert_src, fragment_shader=frag_src)
+        self.uniform_caches = []
+        self.prog_u = self._uniform_cache(self.prog)
 
         # instanced quad
         quad = np.array(
@@ -54,24 +261,23 @@ class Renderer:
         )
         self.vbo = ctx.buffer(quad.tobytes())
 
-        max_segments = grid_w * grid_h
-        self.instance_buf = ctx.buffer(reserve=max_segments * 8)
+        # ---- procedural border (border.vert / border.frag) ----
+        # one board-sized quad per layer instead of one instance per border cell
+        border_vert = (self.shader_dir / "border.vert").read_text()
+        border_frag = (self.shader_dir / "border.frag").read_text()
+        self.border_prog = ctx.program(vertex_shader=border_vert, fragment_shader=border_frag)
+        self.border_u = self._uniform_cache(self.border_prog)
+        self.border_vao = ctx.vertex_array(self.border_prog, [(self.vbo, "2f", "in_vert")])
+        self.border_u.set("u_padding", padding)
 
-        self.vao = ctx.vertex_array(
-            self.prog,
-            [
-                (self.vbo, "2f", "in_vert"),
-                (self.instance_buf, "2f/i", "in_offset"),
-            ],
-        )
+        self.instance_buf = None
+        self.set_grid_size(grid_w, grid_h)
+        self.palette = np.zeros((PALETTE_SIZE, 4), dtype="f4")
+        self.palette_jitter = np.zeros(PALETTE_SIZE, dtype="f4")
 
         # set uniforms
-        if "u_resolution" in self.prog:
-            self.prog["u_resolution"].value = (grid_w, grid_h)
-        if "u_padding" in self.prog:
-            self.prog["u_padding"].value = padding
-        if "u_screen" in self.prog:
-            self.prog["u_screen"].value = (self.screen_size[0], self.screen_size[1])
+        self.prog_u.set("u_padding", padding)
+        self.prog_u.set("u_screen", (self.screen_size[0], self.screen_size[1]))
 
         # ---- fullscreen helper shaders ----
         overlay_vert = (self.shader_dir / "overlay.vert").read_text()
@@ -129,6 +335,22 @@ class Renderer:
             self.kawase_prog, [(self.full_vbo, "2f", "in_pos")]
         )
 
+        # Dual filter: progressive downsample/upsample through a mip chain
+        dual_down_frag = (self.shader_dir / "dual_down.frag").read_text()
+        self.dual_down_prog = ctx.program(
+            vertex_shader=overlay_vert, fragment_shader=dual_down_frag
+        )
+        self.full_vao_dual_down = ctx.vertex_array(
+            self.dual_down_prog, [(self.full_vbo, "2f", "in_pos")]
+        )
+        dual_up_frag = (self.shader_dir / "dual_up.frag").read_text()
+        self.dual_up_prog = ctx.program(
+            vertex_shader=overlay_vert, fragment_shader=dual_up_frag
+        )
+        self.full_vao_dual_up = ctx.vertex_array(
+            self.dual_up_prog, [(self.full_vbo, "2f", "in_pos")]
+        )
+
         # Composite with optional dirt map and ACES-ish tonemap + exposure
         composite_frag = (self.shader_dir / "composite.frag").read_text()
         self.composite_prog = ctx.program(
@@ -137,6 +359,17 @@ class Renderer:
         self.full_vao_composite = ctx.vertex_array(
             self.composite_prog, [(self.full_vbo, "2f", "in_pos")]
         )
+        # ...and the same pass with chromatic aberration folded in, used when
+        # both effects are on so the composite never round-trips through VRAM
+        self.composite_chroma_prog = ctx.program(
+            vertex_shader=overlay_vert,
+            fragment_shader=composite_frag.replace(
+                "#version 330", "#version 330\n#define CHROMA", 1
+            ),
+        )
+        self.full_vao_composite_chroma = ctx.vertex_array(
+            self.composite_chroma_prog, [(self.full_vbo, "2f", "in_pos")]
+        )
 
         # fallback gaussian blur program
         try:
@@ -159,18 +392,55 @@ class Renderer:
             self.chroma_prog, [(self.full_vbo, "2f", "in_pos")]
         )
 
-        # allocate textures/framebuffers
-        self._alloc_buffers(self.screen_size[0], self.screen_size[1])
+        # uniform write caches for the fullscreen/text programs
+        self.overlay_u = self._uniform_cache(self.overlay_prog)
+        self.blit_u = self._uniform_cache(self.blit_prog)
+        self.text_u = self._uniform_cache(self.text_prog)
+        self.bright_u = self._uniform_cache(self.bright_prog)
+        self.kawase_u = self._uniform_cache(self.kawase_prog)
+        self.dual_down_u = self._uniform_cache(self.dual_down_prog)
+        self.dual_up_u = self._uniform_cache(self.dual_up_prog)
+        self.composite_u = self._uniform_cache(self.composite_prog)
+        self.composite_chroma_u = self._uniform_cache(self.composite_chroma_prog)
+        self.gaussian_u = self._uniform_cache(self.gaussian_prog)
+        self.chroma_u = self._uniform_cache(self.chroma_prog)
+
+        # textures/framebuffers; which ones depends on the effects in use,
+        # see render_target_plan
+        self.bloom_enabled = True
+        self.bloom_blur = "Kawase"  # one of BLOOM_BLURS
+        self.bloom_levels = 4  # mips in the "Dual Filter" chain
+        self.chroma_enabled = True
+        self.chroma_amount = 0.0
+        self.chroma_bias = 0.0
+        self.fused_post = True  # composite + chroma in one pass when both are on
+        self.targets = {}  # name -> ((size, components, dtype), tex, fbo)
+        # what went into this frame's bloom mask (None: something that can't
+        # be compared, like shake) and what the blurred bloom was made from
+        self._bloom_inputs = []
+        self._bloom_key = None
+        # opt-in: re-blur a sliding snake's glow only every 1/N of a cell,
+        # letting the glow lag behind it (0: exact, re-blur when it moves)
+        self.bloom_motion_steps = 0
+        self.bloom_blurs = 0
+        self.bloom_reuses = 0
+        self.scene_tex = self.scene_fbo = None
+        self.bloom_tex = self.bloom_fbo = None
+        self.board_fbo = None
+        # nothing is allocated until the first start_frame, so the owner can
+        # set the effects first (a new renderer would otherwise build the
+        # full bloom chain only to drop it again)
+        self._target_config = None
 
         # bloom parameters
         self.bloom_threshold = 0.85
         self.bloom_gain = 1.4  # per-object multiplier when writing bloom objects
-        self.bloom_objects: List[
-            Tuple[int, int, Tuple[float, float, float, float]]
-        ] = []
+        # per-palette bloom strength; the apple glows twice as bright
+        self.bloom_weight = np.ones(PALETTE_SIZE, dtype="f4")
+        self.bloom_weight[PALETTE_APPLE] = 2.0
 
-        # choose blur algorithm
-        self.use_kawase = True
+        # shake jitter has its own stream so it never disturbs game RNGs
+        self.jitter_rng = random.Random()
 
         # dirt map. Loading via set_dirt(path)
         self._dirt_tex_path = None
@@ -189,66 +459,167 @@ class Renderer:
             self.text_prog, [(self.text_vbo, "2f 2f", "in_pos", "in_uv")]
         )
 
-        # vertex instance buffer written later
+        # glyph atlas text: one instanced draw for all queued strings
+        atlas_vert = (self.shader_dir / "text_atlas.vert").read_text()
+        atlas_frag = (self.shader_dir / "text_atlas.frag").read_text()
+        self.text_atlas_prog = ctx.program(vertex_shader=atlas_vert, fragment_shader=atlas_frag)
+        self.text_atlas_u = self._uniform_cache(self.text_atlas_prog)
+        self.glyph_atlases = {}  # font size -> GlyphAtlas
+        self.text_instance_buf = ctx.buffer(reserve=256 * TEXT_INSTANCE_BYTES)
+        self.text_atlas_vao = ctx.vertex_array(
+            self.text_atlas_prog,
+            [
+                (self.vbo, "2f", "in_vert"),
+                (self.text_instance_buf, "4f 4f 4f/i", "in_rect", "in_uv_rect", "in_color"),
+            ],
+        )
+        self._text_parts = []  # (atlas, instances) in draw order
+        self._text_count = 0
+        self._text_uploaded = b""  # skip the upload when a frame's text is unchanged
+
+        # rounded rects: one instanced draw per run of consecutive rects.
+        # Compiled here rather than on first use so the first menu frame
+        # doesn't stall on a shader compile.
+        rect_vert = (self.shader_dir / "rect.vert").read_text()
+        rect_frag = (self.shader_dir / "rect.frag").read_text()
+        self.rect_prog = ctx.program(vertex_shader=rect_vert, fragment_shader=rect_frag)
+        self.rect_u = self._uniform_cache(self.rect_prog)
+        self.rect_instance_buf = ctx.buffer(reserve=64 * RECT_INSTANCE_BYTES)
+        self.rect_vao = ctx.vertex_array(
+            self.rect_prog,
+            [
+                (self.vbo, "2f", "in_vert"),
+                (self.rect_instance_buf, "4f 4f 1f/i", "in_rect", "in_color", "in_radius"),
+            ],
+        )
+        self._rects = []  # (x, y, w, h, r, g, b, a, radius) in draw order
+        self._rects_uploaded = b""
+
+        # per-string textures, used for characters missing from the atlas
         self.text_cache = OrderedDict()  # replace existing dict
         self.font_cache = {}             # already present
         self.MAX_TEXT_CACHE = 128        # tune this (128 is reasonable)
+        self.text_metrics = {}           # (text, size) -> (w, h), see text_size
+        self.MAX_TEXT_METRICS = 1024
 
     # ------------------------------
     # Buffer allocation / resize
     # ------------------------------
     def _alloc_buffers(self, w: int, h: int):
-        # release if present
-        for attr in [
-            "scene_fbo",
-            "scene_tex",
-            "bloom_fbo",
-            "bloom_tex",
-            "ping_fbo",
-            "ping_tex",
-            "pong_fbo",
-            "pong_tex",
-            "small_ping_fbo",
-            "small_ping_tex",
-            "small_pong_fbo",
-            "small_pong_tex",
-        ]:
-            if hasattr(self, attr):
-                try:
-                    getattr(self, attr).release()
-                except Exception:
-                    pass
+        """Allocate the targets the current settings need, release the rest."""
+        config = self._pipeline_config()
+        plan = render_target_plan((w, h), *config)
+        for name in list(self.targets):
+            if name not in plan:
+                self._release_target(name)
+        for name, spec in plan.items():
+            self._target(name, *spec)
+        self._target_config = ((w, h),) + config
+
+        self.scene_tex, self.scene_fbo = self.targets["scene"][1:]
+        if self.bloom_enabled:
+            self.bloom_tex, self.bloom_fbo = self.targets["bloom"][1:]
+        else:
+            self.bloom_tex = self.bloom_fbo = None
+
+        # board cells write scene color and bloom mask in the same pass
+        if self.board_fbo is not None:
+            self.board_fbo.release()
+        attachments = [self.scene_tex]
+        if self.bloom_tex is not None:
+            attachments.append(self.bloom_tex)
+        self.board_fbo = self.ctx.framebuffer(color_attachments=attachments)
+
+    def _pipeline_config(self):
+        """(bloom, chroma, bloom_levels) arguments for render_target_plan.
+
+        `chroma` is True only when aberration needs its own pass after the
+        bloom composite; the fused shader and the no-bloom path read the
+        scene directly.
+        """
+        chroma = self.chroma_enabled and self.chroma_amount > 0.0 and not self.fused_post
+        levels = 0
+        if self.bloom_blur == "Dual Filter":
+            levels = max(1, min(int(self.bloom_levels), MAX_BLOOM_LEVELS))
+        return self.bloom_enabled, chroma, levels
+
+    def _target(self, name: str, size: Tuple[int, int], components: int = 4, dtype: str = "f1"):
+        """(texture, framebuffer) for a named target, (re)allocated on a spec change."""
+        spec = (tuple(size), components, dtype)
+        entry = self.targets.get(name)
+        if entry is not None and entry[0] == spec:
+            return entry[1], entry[2]
+        self._release_target(name)
+        self._bloom_key = None
+        tex = self.ctx.texture(spec[0], components, dtype=dtype)
+        tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        fbo = self.ctx.framebuffer(color_attachments=[tex])
+        self.targets[name] = (spec, tex, fbo)
+        return tex, fbo
+
+    def _release_target(self, name: str):
+        entry = self.targets.pop(name, None)
+        if entry is not None:
+            entry[2].release()
+            entry[1].release()
+
+    def vram_report(self):
+        """Bytes held by each live render target: ({name: bytes}, total)."""
+        sizes = {
+            name: size[0] * size[1] * components * DTYPE_BYTES[dtype]
+            for name, ((size, components, dtype), _, _) in self.targets.items()
+        }
+        return sizes, sum(sizes.values())
+
+    def set_grid_size(self, grid_w: int, grid_h: int):
+        """Resize the board; instance storage holds one entry per cell."""
+        self.grid_w = grid_w
+        self.grid_h = grid_h
 
-        # main scene
-        self.scene_tex = self.ctx.texture((w, h), 4)
-        self.scene_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
-        self.scene_fbo = self.ctx.framebuffer(color_attachments=[self.scene_tex])
-
-        # bloom HDR buffer (float)
-        self.bloom_tex = self.ctx.texture((w, h), 4, dtype="f4")
-        self.bloom_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
-        self.bloom_fbo = self.ctx.framebuffer(color_attachments=[self.bloom_tex])
-
-        # full-res ping/pong (not normally used)
-        self.ping_tex = self.ctx.texture((w, h), 4)
-        self.pong_tex = self.ctx.texture((w, h), 4)
-        self.ping_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
-        self.pong_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
-        self.ping_fbo = self.ctx.framebuffer(color_attachments=[self.ping_tex])
-        self.pong_fbo = self.ctx.framebuffer(color_attachments=[self.pong_tex])
-
-        # half-res ping/pong for blur
-        down_w = max(1, w // 2)
-        down_h = max(1, h // 2)
-        self.small_ping_tex = self.ctx.texture((down_w, down_h), 4)
-        self.small_pong_tex = self.ctx.texture((down_w, down_h), 4)
-        self.small_ping_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
-        self.small_pong_tex.filter = (moderngl.LINEAR, moderngl.LINEAR)
-        self.small_ping_fbo = self.ctx.framebuffer(
-            color_attachments=[self.small_ping_tex]
+        if self.instance_buf is not None:
+            self.vao.release()
+            self.instance_buf.release()
+            self.snake_ring.release()
+        cells = grid_w * grid_h
+        # Per-frame board batch. A won board holds every cell plus the apple
+        # under the head, hence the extra slot.
+        self.board_capacity = cells + 1
+        self.instance_buf = self.ctx.buffer(reserve=self.board_capacity * INSTANCE_BYTES)
+        self.vao = self.ctx.vertex_array(
+            self.prog,
+            [
+                (self.vbo, "2f", "in_vert"),
+                (self.instance_buf, "2f 2f 1f/i", "in_offset", "in_prev_offset", "in_palette"),
+            ],
         )
-        self.small_pong_fbo = self.ctx.framebuffer(
-            color_attachments=[self.small_pong_tex]
+
+        # Snake segments live in a persistent ring: push number p sits in
+        # slot p % cells. Every slot is stored twice (at slot and
+        # slot + cells) so any run of up to `cells` segments is contiguous
+        # and reaches the board batch with a single GPU-side copy.
+        self.snake_ring = self.ctx.buffer(reserve=2 * cells * INSTANCE_BYTES)
+        self._ring_source = None  # (id, epoch) of the segments in the ring
+        self._ring_pushes = 0
+
+        self._board_parts = []  # instance arrays placed after the snake
+        self._board_snake = None  # (tail slot, length) in snake_ring
+        self._board_tail_prev = None  # where the snake's tail slides from
+        self._board_alpha = 1.0  # interpolation between ticks, see draw_snake
+        self._board_count = 0
+
+        for u in (self.prog_u, self.border_u):
+            u.set("u_resolution", (grid_w, grid_h))
+
+    def _uniform_cache(self, prog) -> UniformCache:
+        cache = UniformCache(prog)
+        self.uniform_caches.append(cache)
+        return cache
+
+    def uniform_stats(self) -> Tuple[int, int]:
+        """Total (writes, skipped) uniform updates across all programs."""
+        return (
+            sum(u.writes for u in self.uniform_caches),
+            sum(u.skipped for u in self.uniform_caches),
         )
 
     def set_screen_size(self, size: Tuple[int, int]):
@@ -263,103 +634,230 @@ class Renderer:
     # Per-frame start
     # ------------------------------
     def start_frame(self):
-        # render to scene fbo
-        self.scene_fbo.use()
-        self.ctx.blend_func = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA)
-        self.ctx.clear(0.05, 0.05, 0.05, 1.0)
+        if self._target_config != (tuple(self.screen_size),) + self._pipeline_config():
+            self._alloc_buffers(self.screen_size[0], self.screen_size[1])
 
-        # ensure bloom buffer cleared (HDR float clear)
-        self.bloom_fbo.use()
-        self.ctx.blend_func = (moderngl.ONE, moderngl.ZERO)
-        self.ctx.clear(0.0, 0.0, 0.0, 0.0)
+        # clears ignore blending, so no state juggling is needed here
+        self.scene_fbo.clear(0.05, 0.05, 0.05, 1.0)
+        # ensure bloom buffer cleared (HDR float clear); the board pass adds to it
+        if self.bloom_fbo is not None:
+            self.bloom_fbo.clear(0.0, 0.0, 0.0, 0.0)
+        self._bloom_inputs = []
 
-        # restore scene fbo
+        # render to scene fbo
         self.scene_fbo.use()
         self.ctx.blend_func = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA)
 
         # update uniforms if present
-        if "u_screen" in self.prog:
-            self.prog["u_screen"].value = (self.screen_size[0], self.screen_size[1])
-        if "u_resolution" in self.prog:
-            self.prog["u_resolution"].value = (self.grid_w, self.grid_h)
+        self.prog_u.set("u_screen", (self.screen_size[0], self.screen_size[1]))
+        self.prog_u.set("u_resolution", (self.grid_w, self.grid_h))
 
     # ------------------------------
     # Bloom pass: render bright objects into bloom_fbo
     # ------------------------------
     def bloom_pass(self):
-        """Render collected bloom_objects (positions + color) into bloom_fbo as HDR mask."""
-        if not hasattr(self, "bloom_fbo") or not self.bloom_objects:
-            # clear list anyway
-            self.bloom_objects.clear()
-            return
-
-        # ensure bloom fbo cleared and additive blending
-        self.bloom_fbo.use()
-        self.ctx.blend_func = (moderngl.ONE, moderngl.ZERO)
-        self.ctx.clear(0.0, 0.0, 0.0, 0.0)
-        self.ctx.blend_func = (moderngl.ONE, moderngl.ONE)
-
-        # group by color to minimize uniform sets/cache thrash
-        by_color = {}
-        for x, y, col in self.bloom_objects:
-            key = col[:3]
-            by_color.setdefault(key, []).append((x, y))
-
-        for col, positions in by_color.items():
-            if not positions:
-                continue
-            self.write_instances(positions)
-            if "u_color" in self.prog:
-                self.prog["u_color"].value = (col[0], col[1], col[2], 1.0)
-            self.vao.render(mode=moderngl.TRIANGLES, instances=len(positions))
+        """Finish the bloom mask for this frame.
 
-        # restore state
-        self.ctx.blend_func = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA)
-        self.scene_fbo.use()
-        self.bloom_objects.clear()
+        Board cells write the bloom mask in the same pass as the scene (see
+        flush_board), so all that is left here is drawing whatever is still
+        queued.
+        """
+        self.flush()
 
     # ------------------------------
     # Instance write + draw helpers
     # ------------------------------
-    def write_instances(
-        self, positions: List[Tuple[int, int]], jitter: Tuple[float, float] = (0.0, 0.0)
-    ):
-        if jitter != (0.0, 0.0):
-            out = []
-            for x, y in positions:
-                jx = random.uniform(-jitter[0], jitter[0])
-                jy = random.uniform(-jitter[1], jitter[1])
-                out.append((float(x) + jx, float(y) + jy))
-            arr = np.array(out, dtype="f4")
-        else:
-            arr = np.array(positions, dtype="f4")
-        self.instance_buf.write(arr.tobytes())
+    def _cell_instances(self, positions: Collection[Tuple[int, int]], palette: int):
+        # flatten straight from the iterable (e.g. Snake.positions() view)
+        # without building an intermediate list of tuples
+        n = len(positions)
+        arr = np.empty((n, 5), dtype="f4")
+        arr[:, :2] = np.fromiter(
+            chain.from_iterable(positions), dtype="f4", count=2 * n
+        ).reshape(n, 2)
+        arr[:, 2:4] = arr[:, :2]
+        arr[:, 4] = palette
+        return arr
+
+    def flush(self):
+        """Draw all queued batches (board cells, text, rects)."""
+        self._switch_batch(None)
+
+    def _switch_batch(self, batch):
+        # Anything queued in another batch was drawn earlier, so it has to
+        # reach the target first to keep the layering.
+        if batch != "board":
+            self.flush_board()
+        if batch != "text":
+            self.flush_text()
+        if batch != "rect":
+            self.flush_rects()
+
+    def _submit_cells(self, positions: Collection[Tuple[int, int]], palette: int):
+        self._switch_batch("board")
+        if self._board_count + len(positions) > self.board_capacity:
+            self.flush_board()
+        self._board_parts.append(self._cell_instances(positions, palette))
+        self._board_count += len(positions)
+
+    def flush_board(self):
+        """Draw every cell submitted since the last flush with one instanced call.
+
+        draw_snake/draw_obstacles/draw_apple only queue their cells; this is
+        called automatically before anything else is drawn. The draw goes to
+        board_fbo, writing the scene color and the HDR bloom mask at once.
+        """
+        if not self._board_count:
+            return
+        first = 0
+        if self._board_snake is not None:
+            tail, n = self._board_snake
+            self.ctx.copy_buffer(
+                self.instance_buf, self.snake_ring, n * INSTANCE_BYTES,
+                read_offset=tail * INSTANCE_BYTES,
+            )
+            if self._board_alpha != 1.0:
+                # the ring slides the tail in from the cell pushed before it,
+                # but it stays put while the snake grows
+                self.instance_buf.write(self._board_tail_prev, offset=8)
+            first = n
+        if self._board_parts:
+            parts = self._board_parts
+            extras = parts[0] if len(parts) == 1 else np.concatenate(parts)
+            self.instance_buf.write(extras, offset=first * INSTANCE_BYTES)
+
+        self.prog_u.write("u_palette", self.palette)
+        bloom = self.palette[:, :3] * (self.bloom_gain * self.bloom_weight[:, None])
+        self.prog_u.write("u_bloom_palette", bloom.astype("f4"))
+        self.prog_u.write("u_jitter", self.palette_jitter)
+        self.prog_u.set("u_alpha", self._board_alpha)
+        if self.palette_jitter.any():
+            self.prog_u.set("u_jitter_seed", self.jitter_rng.uniform(0.0, 1000.0))
+
+        # Record what this draw adds to the bloom mask so present() can
+        # reuse last frame's blur. The snake is identified by its ring
+        # window rather than its positions; plain-list snakes and shaken
+        # cells change every frame. A snake sliding between cells changes
+        # the mask every frame too, unless bloom_motion_steps rounds its
+        # alpha (and the glow trails it by up to that fraction of a cell).
+        if self._bloom_inputs is not None:
+            alpha = self._board_alpha
+            if self.bloom_motion_steps:
+                alpha = round(alpha * self.bloom_motion_steps)
+            if self.palette_jitter.any() or (
+                self._board_snake is not None and self._ring_source is None
+            ):
+                self._bloom_inputs = None
+            else:
+                self._bloom_inputs.append((
+                    self._board_snake and (self._ring_source, self._ring_pushes) + self._board_snake,
+                    alpha,
+                    self._board_tail_prev.tobytes() if self._board_alpha != 1.0 else b"",
+                    extras.tobytes() if self._board_parts else b"",
+                    bloom.tobytes(),
+                ))
+
+        # quad.frag outputs premultiplied scene color and bloom with alpha 0,
+        # so one blend func gives alpha blending on the scene attachment and
+        # additive accumulation on the bloom attachment. Alpha keeps the
+        # SRC_ALPHA factor: present() blends the scene by it when bloom is off.
+        self.board_fbo.use()
+        self.ctx.blend_func = (
+            moderngl.ONE, moderngl.ONE_MINUS_SRC_ALPHA,
+            moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA,
+        )
+        self.vao.render(mode=moderngl.TRIANGLES, instances=self._board_count)
+        self.ctx.blend_func = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA)
+        self.scene_fbo.use()
+
+        self._board_parts.clear()
+        self._board_snake = None
+        self._board_alpha = 1.0
+        self._board_count = 0
+
+    def _ring_write(self, first: int, positions, before=None):
+        """Write consecutive pushes starting at push number `first`.
+
+        Each push slides in from the cell of the push before it; `before` is
+        that cell for the first one, if known.
+        """
+        cells = self.grid_w * self.grid_h
+        arr = self._cell_instances(positions, PALETTE_SNAKE)
+        arr[1:, 2:4] = arr[:-1, :2]
+        if before is not None:
+            arr[0, 2:4] = before
+        # steps that wrap around the board snap instead of sweeping across it
+        jump = np.abs(arr[:, :2] - arr[:, 2:4]).max(axis=1) > 1.0
+        arr[jump, 2:4] = arr[jump, :2]
+        slot = first % cells
+        # primary copy; may run past `cells` into the mirror half
+        self.snake_ring.write(arr, offset=slot * INSTANCE_BYTES)
+        # mirror of the part below `cells`, primary of the wrapped part
+        split = cells - slot
+        if split > 0:
+            self.snake_ring.write(arr[:split], offset=(slot + cells) * INSTANCE_BYTES)
+        if split < len(arr):
+            self.snake_ring.write(arr[split:], offset=0)
+
+    def _sync_snake_ring(self, segments) -> int:
+        """Bring the ring up to date with `segments`; returns the tail slot.
+
+        With a Snake.positions() view only heads pushed since the last call
+        are uploaded; anything else (plain lists, reset or loaded snakes, a
+        different snake) is uploaded whole.
+        """
+        n = len(segments)
+        pushes = getattr(segments, "pushes", None)
+        source = (id(segments), getattr(segments, "epoch", None))
+        if pushes is None:
+            pushes = n
+            source = None
+        new = pushes - self._ring_pushes
+        if source is None or source != self._ring_source or not 0 <= new <= n:
+            self._ring_write(pushes - n, segments)
+        elif new:
+            heads = list(islice(reversed(segments), new + 1))
+            heads.reverse()
+            if len(heads) > new:
+                self._ring_write(pushes - new, heads[1:], before=heads[0])
+            else:
+                self._ring_write(pushes - new, heads)
+        self._ring_source = source
+        self._ring_pushes = pushes
+        return (pushes - n) % (self.grid_w * self.grid_h)
 
     def draw_snake(
         self,
-        segments: List[Tuple[int, int]],
+        segments: Collection[Tuple[int, int]],
         color: Tuple[float, float, float, float],
         shake: float = 0.0,
+        alpha: float = 1.0,
+        last_tail: Optional[Tuple[int, int]] = None,
     ):
+        """Queue the snake (tail first, e.g. Snake.positions()).
+
+        With `alpha` < 1 every segment is drawn that fraction of the way from
+        where it was before the last step, so motion stays smooth between
+        ticks. `last_tail` is the cell the tail left on that step
+        (Snake.last_tail); None keeps the tail in place, as when growing.
+        """
         if not segments:
             return
-        jitter = (shake, shake) if shake else (0.0, 0.0)
-        BLOOM_GAIN = self.bloom_gain
-
-        self.write_instances(segments, jitter=jitter)
-        if "u_color" in self.prog:
-            self.prog["u_color"].value = color
-        self.vao.render(mode=moderngl.TRIANGLES, instances=len(segments))
-
-        # Bloom calculation must use the received color
-        bloom_col = (
-            color[0] * BLOOM_GAIN,
-            color[1] * BLOOM_GAIN,
-            color[2] * BLOOM_GAIN,
-            1.0,
-        )
-        for x, y in segments:
-            self.bloom_objects.append((x, y, bloom_col))
+        self._switch_batch("board")
+        # the snake sits at the front of the batch, so one per flush
+        n = len(segments)
+        if self._board_snake is not None or self._board_count + n > self.board_capacity:
+            self.flush_board()
+        self._board_snake = (self._sync_snake_ring(segments), n)
+        self._board_count += n
+        self._board_alpha = float(alpha)
+        if alpha != 1.0:
+            tail = segments[0]
+            if last_tail is None or max(abs(last_tail[0] - tail[0]), abs(last_tail[1] - tail[1])) > 1:
+                last_tail = tail
+            self._board_tail_prev = np.array(last_tail, dtype="f4")
+        self.palette[PALETTE_SNAKE] = color
+        self.palette_jitter[PALETTE_SNAKE] = shake
 
     # Add color argument to draw_apple
     def draw_apple(
@@ -368,24 +866,9 @@ class Renderer:
         color: Tuple[float, float, float, float],
         shake: float = 0.0,
     ):
-        jitter = (shake, shake) if shake else (0.0, 0.0)
-        BLOOM_GAIN = self.bloom_gain
-
-        self.write_instances([apple], jitter=jitter)
-        if "u_color" in self.prog:
-            self.prog["u_color"].value = color
-        self.vao.render(mode=moderngl.TRIANGLES, instances=1)
-
-        # Bloom calculation must use the received color
-        bloom_col = (
-            color[0] * BLOOM_GAIN,
-            color[1] * BLOOM_GAIN,
-            color[2] * BLOOM_GAIN,
-            1.0,
-        )
-        self.bloom_objects.append((apple[0], apple[1], bloom_col))
-
-        self.bloom_objects.append((apple[0], apple[1], bloom_col))
+        self._submit_cells([apple], PALETTE_APPLE)
+        self.palette[PALETTE_APPLE] = color
+        self.palette_jitter[PALETTE_APPLE] = shake
 
     def draw_obstacles(
         self,
@@ -395,21 +878,9 @@ class Renderer:
         if not obstacles:
             return
         
-        self.write_instances(list(obstacles))
-        if "u_color" in self.prog:
-            self.prog["u_color"].value = color
-        self.vao.render(mode=moderngl.TRIANGLES, instances=len(obstacles))
-        
-        # Obstacles also bloom
-        BLOOM_GAIN = self.bloom_gain
-        bloom_col = (
-            color[0] * BLOOM_GAIN,
-            color[1] * BLOOM_GAIN,
-            color[2] * BLOOM_GAIN,
-            1.0,
-        )
-        for x, y in obstacles:
-            self.bloom_objects.append((x, y, bloom_col))
+        self._submit_cells(obstacles, PALETTE_OBSTACLE)
+        self.palette[PALETTE_OBSTACLE] = color
+        self.palette_jitter[PALETTE_OBSTACLE] = 0.0
 
     # ------------------------------
     # The combined present() with brightpass + kawase/gaussian + composite
@@ -420,207 +891,231 @@ class Renderer:
         bloom_strength: float = 0.6,
         bloom_radius: float = 2.0,
     ):
+        self.flush()
+
         # ----------------------------------------------------
         # DEBUG MODE
         # ----------------------------------------------------
         if self.debug_mode:
             self.ctx.screen.use()
             self.ctx.clear(0.0, 0.0, 0.0, 1.0)
-            if self.debug_mode == "bloom":
-                self.bloom_tex.use(0)
-            elif self.debug_mode == "bright":
-                # bright-pass is produced to small_ping during normal present — show what was last computed
-                self.small_ping_tex.use(0)
-            elif self.debug_mode == "blur_h":
-                self.small_pong_tex.use(0)
-            elif self.debug_mode == "blur_v":
-                self.small_ping_tex.use(0)
-            elif self.debug_mode == "blur_final":
-                self.small_ping_tex.use(0)
-            else:
-                self.scene_tex.use(0)
-            if "tex" in self.blit_prog:
-                self.blit_prog["tex"].value = 0
+            # views fall back to the scene when their target is not allocated
+            view = {
+                "bloom": "bloom",
+                # bright-pass is produced to bloom_ping during normal present — show what was last computed
+                "bright": "bloom_ping",
+                "blur_h": "bloom_pong",
+                "blur_v": "bloom_ping",
+                "blur_final": "bloom_ping",
+            }.get(self.debug_mode, "scene")
+            self.targets.get(view, self.targets["scene"])[1].use(0)
+            self.blit_u.set("tex", 0)
             self.full_vao_blit.render()
             return
 
+        # every pass below covers the whole target with opaque pixels, so
+        # only the plain blit (which keeps the scene's alpha) needs a clear
         self.ctx.screen.use()
-        self.ctx.clear(0.0, 0.0, 0.0, 1.0)
+
+        _, chroma_pass, levels = self._pipeline_config()
+        chroma = self.chroma_enabled and self.chroma_amount > 0.0
+        bloom = bloom and self.bloom_tex is not None
 
         # ----------------------------------------------------
         # SIMPLE BLIT (NO BLOOM) + CHROMA CHECK
         # ----------------------------------------------------
         if not bloom:
             # If CA is enabled, render scene through CA, else simple blit
-            if self.chroma_enabled and self.chroma_amount > 0.0:
+            if chroma:
                 self.ctx.screen.use()
                 self.scene_tex.use(0)
-                if "tex" in self.chroma_prog:
-                    self.chroma_prog["tex"].value = 0
-                if "u_amount" in self.chroma_prog:
-                    self.chroma_prog["u_amount"].value = float(self.chroma_amount)
-                if "u_center_bias" in self.chroma_prog:
-                    self.chroma_prog["u_center_bias"].value = float(self.chroma_bias)
-                if "u_resolution" in self.chroma_prog:
-                    self.chroma_prog["u_resolution"].value = self.screen_size
+                self.chroma_u.set("tex", 0)
+                self.chroma_u.set("u_amount", float(self.chroma_amount))
+                self.chroma_u.set("u_center_bias", float(self.chroma_bias))
+                self.chroma_u.set("u_resolution", self.screen_size)
                 self.full_vao_chroma.render()
             else:
+                self.ctx.clear(0.0, 0.0, 0.0, 1.0)
                 self.scene_tex.use(0)
-                if "tex" in self.blit_prog:
-                    self.blit_prog["tex"].value = 0
+                self.blit_u.set("tex", 0)
                 self.full_vao_blit.render()
             return
 
-        # prepare downsample sizes
-        down_w = max(1, self.screen_size[0] // 2)
-        down_h = max(1, self.screen_size[1] // 2)
+        # half-res bright pass; every blur mode leaves its result here
+        plan = render_target_plan(self.screen_size, True, chroma_pass, levels)
+        small_ping_tex = self._target("bloom_ping", *plan["bloom_ping"])[0]
+
+        # Bright-pass and blur depend only on the bloom mask and these
+        # settings; between snake ticks nothing changes, so the last result
+        # in bloom_ping is still good.
+        key = None
+        if self._bloom_inputs is not None:
+            key = (
+                tuple(self._bloom_inputs), tuple(self.screen_size),
+                self.grid_w, self.grid_h, self.padding, self.bloom_threshold,
+                self.bloom_blur, levels, float(bloom_radius),
+            )
+        if key is not None and key == self._bloom_key:
+            self.bloom_reuses += 1
+        else:
+            self._blur_bloom(plan, levels, bloom_radius)
+            self.bloom_blurs += 1
+            self._bloom_key = key
+
+        self._composite(small_ping_tex, bloom_strength, chroma, chroma_pass, plan)
 
-        # CLEAR small ping/pong to avoid trails
-        self.small_ping_fbo.use()
-        self.ctx.clear(0.0, 0.0, 0.0, 0.0)
-        self.small_pong_fbo.use()
-        self.ctx.clear(0.0, 0.0, 0.0, 0.0)
+    def _blur_bloom(self, plan, levels: int, bloom_radius: float):
+        """Bright-pass bloom_tex into bloom_ping and blur it there."""
+        small_ping_tex, small_ping_fbo = self._target("bloom_ping", *plan["bloom_ping"])
+        down_w, down_h = small_ping_tex.size
+        # passes below overwrite every pixel, so nothing needs clearing
+        if not levels:
+            small_pong_tex, small_pong_fbo = self._target("bloom_pong", *plan["bloom_pong"])
 
         # 1) BRIGHT-PASS (threshold BEFORE blur) -> small_ping
-        self.small_ping_fbo.use()
+        small_ping_fbo.use()
         # Source is bloom_tex (which bloom_pass wrote HDR bright objects)
         self.bloom_tex.use(0)
-        if "tex" in self.bright_prog:
-            self.bright_prog["tex"].value = 0
-        if "threshold" in self.bright_prog:
-            self.bright_prog["threshold"].value = float(self.bloom_threshold)
+        self.bright_u.set("tex", 0)
+        self.bright_u.set("threshold", float(self.bloom_threshold))
         self.full_vao_bright.render()
 
-        # 2) BLUR passes (Kawase or Gaussian)
-        if self.use_kawase:
+        # 2) BLUR passes (Dual Filter, Kawase or Gaussian)
+        if levels:
+            # Halve down the mip chain, then tent-filter back up to half res.
+            # Each level has a quarter of the pixels of the one above, so the
+            # glow gets wide for a fraction of a full-size blur's fill rate.
+            chain = [(small_ping_tex, small_ping_fbo)]
+            for level in range(1, levels + 1):
+                name = f"bloom_mip{level}"
+                chain.append(self._target(name, *plan[name]))
+            offset = 0.5 * float(bloom_radius)
+            for (src, _), (_, dst_fbo) in zip(chain, chain[1:]):
+                dst_fbo.use()
+                src.use(0)
+                self.dual_down_u.set("tex", 0)
+                self.dual_down_u.set("offset", offset)
+                self.dual_down_u.set("texel", (1.0 / src.width, 1.0 / src.height))
+                self.full_vao_dual_down.render()
+            for (src, _), (_, dst_fbo) in zip(chain[:0:-1], chain[-2::-1]):
+                dst_fbo.use()
+                src.use(0)
+                self.dual_up_u.set("tex", 0)
+                self.dual_up_u.set("offset", offset)
+                self.dual_up_u.set("texel", (1.0 / src.width, 1.0 / src.height))
+                self.full_vao_dual_up.render()
+        elif self.bloom_blur == "Kawase":
             # Kawase multi-pass offsets
             offsets = [1.0, 2.0, 4.0]  # tweak for softness
-            src = self.small_ping_tex
-            dst_fbo = self.small_pong_fbo
+            src = small_ping_tex
+            dst_fbo = small_pong_fbo
             for off in offsets:
                 dst_fbo.use()
                 src.use(0)
-                if "tex" in self.kawase_prog:
-                    self.kawase_prog["tex"].value = 0
-                if "offset" in self.kawase_prog:
-                    self.kawase_prog["offset"].value = float(off)
-                if "texel" in self.kawase_prog:
-                    self.kawase_prog["texel"].value = (1.0 / down_w, 1.0 / down_h)
+                self.kawase_u.set("tex", 0)
+                self.kawase_u.set("offset", float(off))
+                self.kawase_u.set("texel", (1.0 / down_w, 1.0 / down_h))
                 self.full_vao_kawase.render()
 
                 # swap for next pass
                 src = (
-                    self.small_pong_tex
-                    if dst_fbo is self.small_pong_fbo
-                    else self.small_ping_tex
+                    small_pong_tex
+                    if dst_fbo is small_pong_fbo
+                    else small_ping_tex
                 )
                 # alternate dst
                 dst_fbo = (
-                    self.small_ping_fbo
-                    if dst_fbo is self.small_pong_fbo
-                    else self.small_pong_fbo
+                    small_ping_fbo
+                    if dst_fbo is small_pong_fbo
+                    else small_pong_fbo
                 )
         else:
             # Gaussian separable fallback using gaussian_prog
             if self.gaussian_prog is None:
                 # fallback: single blit (no blur)
-                self.small_ping_fbo.use()
-                self.small_ping_tex.use(0)
+                small_ping_fbo.use()
+                small_ping_tex.use(0)
                 self.full_vao_blit.render()
             else:
                 iterations = 3
                 base_radius = float(bloom_radius)
-                src_ping = self.small_ping_tex
-                dst_ping_fbo = self.small_pong_fbo
+                src_ping = small_ping_tex
+                dst_ping_fbo = small_pong_fbo
                 for i in range(iterations):
                     # horizontal
                     dst_ping_fbo.use()
                     src_ping.use(0)
-                    if "tex" in self.gaussian_prog:
-                        self.gaussian_prog["tex"].value = 0
-                    if "u_dir" in self.gaussian_prog:
-                        self.gaussian_prog["u_dir"].value = (1.0 / down_w, 0.0)
-                    if "u_radius" in self.gaussian_prog:
-                        self.gaussian_prog["u_radius"].value = base_radius * (
-                            1.0 + i * 0.6
-                        )
+                    self.gaussian_u.set("tex", 0)
+                    self.gaussian_u.set("u_dir", (1.0 / down_w, 0.0))
+                    self.gaussian_u.set("u_radius", base_radius * (1.0 + i * 0.6))
                     self.full_vao_gaussian.render()
 
                     # vertical
-                    src_ping = self.small_pong_tex
-                    dst_ping_fbo = self.small_ping_fbo
+                    src_ping = small_pong_tex
+                    dst_ping_fbo = small_ping_fbo
                     dst_ping_fbo.use()
                     src_ping.use(0)
-                    if "tex" in self.gaussian_prog:
-                        self.gaussian_prog["tex"].value = 0
-                    if "u_dir" in self.gaussian_prog:
-                        self.gaussian_prog["u_dir"].value = (0.0, 1.0 / down_h)
-                    if "u_radius" in self.gaussian_prog:
-                        self.gaussian_prog["u_radius"].value = base_radius * (
-                            1.0 + i * 0.6
-                        )
+                    self.gaussian_u.set("tex", 0)
+                    self.gaussian_u.set("u_dir", (0.0, 1.0 / down_h))
+                    self.gaussian_u.set("u_radius", base_radius * (1.0 + i * 0.6))
                     self.full_vao_gaussian.render()
-                    src_ping = self.small_ping_tex
-                    dst_ping_fbo = self.small_pong_fbo
+                    src_ping = small_ping_tex
+                    dst_ping_fbo = small_pong_fbo
 
+    def _composite(self, bloom_tex, bloom_strength, chroma, chroma_pass, plan):
+        """Tonemap scene + blurred bloom to the screen (via "post" for a CA pass)."""
         # ----------------------------------------------------
-        # 3) COMPOSITE PASS -> PONG FBO (LDR Result)
-        # render to pong_fbo instead of the screen to allow for the CA pass.
+        # 3) COMPOSITE PASS -> POST FBO (LDR Result) when a separate CA
+        # pass follows, otherwise straight to the screen (with CA fused in
+        # when it is on).
         # ----------------------------------------------------
-        self.pong_fbo.use()
+        if chroma_pass:
+            post_tex, post_fbo = self._target("post", *plan["post"])
+            post_fbo.use()
+        else:
+            self.ctx.screen.use()
+        if chroma and not chroma_pass:
+            composite_u = self.composite_chroma_u
+            composite_vao = self.full_vao_composite_chroma
+            composite_u.set("u_amount", float(self.chroma_amount))
+            composite_u.set("u_center_bias", float(self.chroma_bias))
+        else:
+            composite_u = self.composite_u
+            composite_vao = self.full_vao_composite
         self.scene_tex.use(0)
-        self.small_ping_tex.use(1)
+        bloom_tex.use(1)
 
-        if "scene" in self.composite_prog:
-            self.composite_prog["scene"].value = 0
-        if "bloom" in self.composite_prog:
-            self.composite_prog["bloom"].value = 1
+        composite_u.set("scene", 0)
+        composite_u.set("bloom", 1)
 
         # bind dirt map if present
         if self.dirt_tex is not None:
             # ensure dirt is set to texture unit 2
             self.dirt_tex.use(2)
-            if "dirt" in self.composite_prog:
-                self.composite_prog["dirt"].value = 2
-            if "has_dirt" in self.composite_prog:
-                self.composite_prog["has_dirt"].value = 1
-            if "dirt_strength" in self.composite_prog:
-                self.composite_prog["dirt_strength"].value = float(self.dirt_strength)
+            composite_u.set("dirt", 2)
+            composite_u.set("has_dirt", 1)
+            composite_u.set("dirt_strength", float(self.dirt_strength))
         else:
-            if "has_dirt" in self.composite_prog:
-                self.composite_prog["has_dirt"].value = 0
+            composite_u.set("has_dirt", 0)
 
-        if "strength" in self.composite_prog:
-            self.composite_prog["strength"].value = float(bloom_strength)
-        if "exposure" in self.composite_prog:
-            self.composite_prog["exposure"].value = float(self.exposure)
+        composite_u.set("strength", float(bloom_strength))
+        composite_u.set("exposure", float(self.exposure))
 
-        self.full_vao_composite.render()
+        composite_vao.render()
 
         # ----------------------------------------------------
-        # 4) CHROMA ABERRATION PASS (or FINAL BLIT) -> SCREEN
+        # 4) CHROMA ABERRATION PASS -> SCREEN
         # ----------------------------------------------------
-        if self.chroma_enabled and self.chroma_amount > 0.0:
+        if chroma_pass:
             self.ctx.screen.use()
-            self.pong_tex.use(0)  # Input is the LDR composite scene
+            post_tex.use(0)  # Input is the LDR composite scene
 
-            if "tex" in self.chroma_prog:
-                self.chroma_prog["tex"].value = 0
-            if "u_amount" in self.chroma_prog:
-                self.chroma_prog["u_amount"].value = float(self.chroma_amount)
-            if "u_center_bias" in self.chroma_prog:
-                self.chroma_prog["u_center_bias"].value = float(self.chroma_bias)
-            if "u_resolution" in self.chroma_prog:
-                self.chroma_prog["u_resolution"].value = self.screen_size
+            self.chroma_u.set("tex", 0)
+            self.chroma_u.set("u_amount", float(self.chroma_amount))
+            self.chroma_u.set("u_center_bias", float(self.chroma_bias))
+            self.chroma_u.set("u_resolution", self.screen_size)
 
             self.full_vao_chroma.render()
-        else:
-            # Final Blit (Composite result to screen, if CA is disabled)
-            self.ctx.screen.use()
-            self.pong_tex.use(0)
-            if "tex" in self.blit_prog:
-                self.blit_prog["tex"].value = 0
-            self.full_vao_blit.render()
 
     # ------------------------------
     # Dirt loader
@@ -654,8 +1149,8 @@ class Renderer:
     # Tint / text / border
     # ------------------------------
     def draw_tint(self, color=(1.0, 0.0, 0.0, 0.35)):
-        if "u_color" in self.overlay_prog:
-            self.overlay_prog["u_color"].value = color
+        self.flush()
+        self.overlay_u.set("u_color", color)
         self.full_vao_overlay.render(mode=moderngl.TRIANGLES)
 
     def _get_font(self, size: int) -> pygame.font.Font:
@@ -671,13 +1166,86 @@ class Renderer:
         font = self.font_cache[size]
         return font
 
+    def _get_atlas(self, size: int) -> GlyphAtlas:
+        atlas = self.glyph_atlases.get(size)
+        if atlas is None:
+            atlas = GlyphAtlas(self.ctx, self._get_font(size))
+            self.glyph_atlases[size] = atlas
+        return atlas
+
     def draw_text(self, text: str, size: int, color=(255, 255, 255), pos=(400, 400)):
+        """
+        Queue text for the instanced glyph-atlas batch (see flush_text).
+        Strings with characters outside the atlas fall back to a cached
+        per-string texture.
+        """
+        size = int(size)
+        atlas = self._get_atlas(size)
+        if not atlas.supports(text):
+            self.flush()
+            self._draw_text_texture(text, size, color, pos)
+            return
+
+        layout = atlas.layout(text)
+        if not len(layout):
+            return
+        self._switch_batch("text")
+
+        inst = np.empty((len(layout), 12), dtype="f4")
+        inst[:, :8] = layout
+        inst[:, 0] += pos[0]
+        inst[:, 1] += pos[1]
+        inst[:, 8:11] = np.asarray(color[:3], dtype="f4") / 255.0
+        inst[:, 11] = color[3] / 255.0 if len(color) > 3 else 1.0
+        self._text_parts.append((atlas, inst))
+        self._text_count += len(inst)
+
+    def flush_text(self):
+        """Draw all queued text: one upload, one instanced call per font size in use."""
+        if not self._text_count:
+            return
+        parts = self._text_parts
+        data = np.concatenate([inst for _, inst in parts]).tobytes()
+        if data != self._text_uploaded:
+            if len(data) > self.text_instance_buf.size:
+                self.text_instance_buf.orphan(max(len(data), 2 * self.text_instance_buf.size))
+            self.text_instance_buf.write(data)
+            self._text_uploaded = data
+
+        self.text_atlas_u.set("u_screen", (self.screen_size[0], self.screen_size[1]))
+        # consecutive strings of the same size share a draw
+        first = 0
+        i = 0
+        while i < len(parts):
+            atlas = parts[i][0]
+            count = 0
+            while i < len(parts) and parts[i][0] is atlas:
+                count += len(parts[i][1])
+                i += 1
+            atlas.texture.use(0)
+            self.text_atlas_vao.bind(
+                self.text_atlas_prog["in_rect"].location, "f", self.text_instance_buf, "4f",
+                offset=first * TEXT_INSTANCE_BYTES, stride=TEXT_INSTANCE_BYTES, divisor=1,
+            )
+            self.text_atlas_vao.bind(
+                self.text_atlas_prog["in_uv_rect"].location, "f", self.text_instance_buf, "4f",
+                offset=first * TEXT_INSTANCE_BYTES + 16, stride=TEXT_INSTANCE_BYTES, divisor=1,
+            )
+            self.text_atlas_vao.bind(
+                self.text_atlas_prog["in_color"].location, "f", self.text_instance_buf, "4f",
+                offset=first * TEXT_INSTANCE_BYTES + 32, stride=TEXT_INSTANCE_BYTES, divisor=1,
+            )
+            self.text_atlas_vao.render(mode=moderngl.TRIANGLES, instances=count)
+            first += count
+
+        parts.clear()
+        self._text_count = 0
+
+    def _draw_text_texture(self, text: str, size: int, color, pos):
         """
         Renders text into a moderngl texture and caches it with an LRU policy.
         Avoid caching wildly-changing strings (e.g., FPS displayed as "FPS: 123").
         """
-        # normalize inputs
-        size = int(size)
         # make color a tuple of ints (immutable)
         color = tuple(int(c) for c in color)
 
@@ -694,16 +1262,11 @@ class Renderer:
             font = self._get_font(size)
             surf = font.render(text, True, color)
             w, h = surf.get_width(), surf.get_height()
-            data = pygame.image.tostring(surf, "RGBA", True)
-
-            # flip rows for moderngl
-            row_stride = w * 4
-            flipped = bytearray()
-            for row in range(h):
-                start = (h - 1 - row) * row_stride
-                flipped.extend(data[start : start + row_stride])
+            # top row first, matching the quad's v = 0 at the top edge; this
+            # is the only copy between the surface and the texture
+            data = pygame.image.tostring(surf, "RGBA", False)
 
-            tex = self.ctx.texture((w, h), 4, bytes(flipped))
+            tex = self.ctx.texture((w, h), 4, data)
             tex.filter = (moderngl.LINEAR_MIPMAP_LINEAR, moderngl.LINEAR)
             tex.build_mipmaps()
 
@@ -719,8 +1282,7 @@ class Renderer:
                     pass
 
         # draw
-        if "u_screen" in self.text_prog:
-            self.text_prog["u_screen"].value = (self.screen_size[0], self.screen_size[1])
+        self.text_u.set("u_screen", (self.screen_size[0], self.screen_size[1]))
 
         x, y = pos
         quad = np.array(
@@ -747,31 +1309,41 @@ class Renderer:
             except Exception:
                 pass
         self.text_cache.clear()
+        for atlas in self.glyph_atlases.values():
+            atlas.release()
+        self.glyph_atlases.clear()
 
     def draw_border(self, thickness: int = 2, color=(0.8, 0.8, 0.8, 1.0)):
-        if thickness <= 0:
+        """Outer ring of `thickness` cells in a single color."""
+        self.draw_border_layers([(thickness, color)])
+
+    def draw_border_layers(self, layers):
+        """Draw stacked board borders in one procedural pass.
+
+        `layers` is a sequence of (thickness, color), bottom first; each is
+        alpha-blended over the ones before it exactly as separate
+        draw_border() calls would be, but in a single instanced draw.
+        """
+        layers = [(int(t), c) for t, c in layers[:MAX_BORDER_LAYERS] if t > 0]
+        if not layers:
             return
-        w = self.grid_w
-        h = self.grid_h
-        positions = []
-        for x in range(0, w):
-            for t in range(thickness):
-                positions.append((x, t))
-                positions.append((x, h - 1 - t))
-        for y in range(thickness, h - thickness):
-            for t in range(thickness):
-                positions.append((t, y))
-                positions.append((w - 1 - t, y))
-        self.write_instances(positions)
-        if "u_color" in self.prog:
-            self.prog["u_color"].value = color
-        self.vao.render(mode=moderngl.TRIANGLES, instances=len(positions))
+        self.flush()
+        self.border_u.set("u_screen", (self.screen_size[0], self.screen_size[1]))
+        thickness = np.zeros(MAX_BORDER_LAYERS, dtype="i4")
+        colors = np.zeros((MAX_BORDER_LAYERS, 4), dtype="f4")
+        for i, (t, c) in enumerate(layers):
+            thickness[i] = t
+            colors[i] = c
+        self.border_u.write("u_layer_thickness", thickness)
+        self.border_u.write("u_layer_colors", colors)
+        self.border_vao.render(mode=moderngl.TRIANGLES, instances=len(layers))
 
     def draw_vignette(self, intensity=5.0):
         """
         Draws a smooth dark vignette around the screen edges.
         Uses the fullscreen quad with a simple radial falloff.
         """
+        self.flush()
 
         # lazy-create the vignette program once
         if not hasattr(self, "_vignette_prog"):
@@ -781,6 +1353,7 @@ class Renderer:
                 vertex_shader=vignette_vert,
                 fragment_shader=vignette_frag,
             )
+            self._vignette_u = self._uniform_cache(self._vignette_prog)
 
             # full-screen quad (two triangles)
             quad = self.ctx.buffer(data=b"-1 -1  1 -1 -1 1  1 -1  1 1 -1 1")
@@ -789,68 +1362,57 @@ class Renderer:
             )
 
         # set intensity
-        self._vignette_prog["intensity"].value = float(intensity)
+        self._vignette_u.set("intensity", float(intensity))
 
         # draw full-screen
         self._vignette_vao.render()
 
+    def text_size(self, text: str, size: int) -> Tuple[int, int]:
+        """(width, height) draw_text would cover, without rendering anything.
+
+        font.size() gives the same numbers as the rendered surface; results
+        are memoized per (text, size) since menus measure every item each frame.
+        """
+        key = (text, int(size))
+        metrics = self.text_metrics.get(key)
+        if metrics is None:
+            metrics = self._get_font(size).size(text)
+            if len(self.text_metrics) >= self.MAX_TEXT_METRICS:
+                self.text_metrics.clear()
+            self.text_metrics[key] = metrics
+        return metrics
+
     def text_width(self, text: str, size: int):
-        font = self._get_font(size)
-        surf = font.render(text, True, (255, 255, 255))
-        return surf.get_width()
+        return self.text_size(text, size)[0]
 
     def text_height(self, text: str, size: int):
-        font = self._get_font(size)
-        surf = font.render(text, True, (255, 255, 255))
-        return surf.get_height()
+        return self.text_size(text, size)[1]
 
     def draw_rect(self, pos, size, color=(1.0, 1.0, 1.0, 1.0), radius=0.0):
         """
-        Draw a solid rectangle in screen pixel coordinates.
+        Queue a solid (optionally rounded) rectangle in screen pixel coordinates.
         pos  = (x, y)
         size = (w, h)
         color = RGBA in 0..1
         radius = Corner radius in pixels
         """
-
-        if not hasattr(self, "_rect_prog"):
-            rect_vert = (self.shader_dir / "rect.vert").read_text()
-            rect_frag = (self.shader_dir / "rect.frag").read_text()
-            self._rect_prog = self.ctx.program(
-                vertex_shader=rect_vert,
-                fragment_shader=rect_frag,
-            )
-
-            # VBO holds pos.xy, uv.xy for a quad
-            self._rect_vbo = self.ctx.buffer(
-                reserve=6 * 16
-            )  # 6 vertices * 16 bytes per vertex
-            self._rect_vao = self.ctx.vertex_array(
-                self._rect_prog, [(self._rect_vbo, "2f 2f", "in_pos", "in_uv")]
-            )
-
-        x, y = pos
-        w, h = size
-
-        quad = np.array(
-            [
-                [x, y, 0.0, 1.0],
-                [x + w, y, 1.0, 1.0],
-                [x + w, y + h, 1.0, 0.0],
-                [x, y, 0.0, 1.0],
-                [x + w, y + h, 1.0, 0.0],
-                [x, y + h, 0.0, 0.0],
-            ],
-            dtype="f4",
-        )
-
-        self._rect_vbo.write(quad.tobytes())
-
-        self._rect_prog["u_screen"].value = (self.screen_size[0], self.screen_size[1])
-        self._rect_prog["u_color"].value = color
-
-        self._rect_prog["u_rect_pos"].value = pos
-        self._rect_prog["u_rect_size"].value = size
-        self._rect_prog["u_radius"].value = radius
-
-        self._rect_vao.render(moderngl.TRIANGLES)
+        self._switch_batch("rect")
+        color = tuple(color)
+        if len(color) == 3:
+            color += (1.0,)
+        self._rects.append((pos[0], pos[1], size[0], size[1]) + color + (radius,))
+
+    def flush_rects(self):
+        """Draw all queued rects with one upload and one instanced call."""
+        if not self._rects:
+            return
+        data = np.array(self._rects, dtype="f4").tobytes()
+        if data != self._rects_uploaded:
+            if len(data) > self.rect_instance_buf.size:
+                self.rect_instance_buf.orphan(max(len(data), 2 * self.rect_instance_buf.size))
+            self.rect_instance_buf.write(data)
+            self._rects_uploaded = data
+
+        self.rect_u.set("u_screen", (self.screen_size[0], self.screen_size[1]))
+        self.rect_vao.render(moderngl.TRIANGLES, instances=len(self._rects))
+        self._rects.clear()
@@ -0,0 +1,264 @@
+"""Input-log replays.
+
+A replay is the Snake seed plus the ticks on which the direction changed,
+which is all that is needed to re-run a game exactly. Like simulate.py this
+only depends on game.py, so replays can be verified on headless machines:
+
+    python -m src.replay highscore.replay more/*.replay
+
+Binary layout (little-endian):
+
+    magic      4s   b"SSRP"
+    version    u8
+    mode       u8   index into MODES
+    outcome    u8   index into OUTCOMES
+    grid_w     u16
+    grid_h     u16
+    seed       u64
+    ticks      varint   number of steps the game ran for
+    score      varint   claimed final score
+    n_events   varint
+    events     n_events varints of (tick_delta << 2) | direction
+"""
+import argparse
+import struct
+import time
+
+import numpy as np
+
+from .game import DIRECTION_CODES, DIRECTIONS, BatchSnake, Snake
+
+MAGIC = b"SSRP"
+VERSION = 1
+MODES = ("Classic", "Arcade")
+OUTCOMES = ("unfinished", "died", "won")
+
+_HEADER = struct.Struct("<4sBBBHHQ")
+
+# Below this many replays per board setup, stepping them one by one with
+# run_replay beats BatchSnake's per-tick numpy overhead.
+MIN_BATCH = 128
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int):
+    value = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """A recorded game: seed, board setup and (tick, direction) changes.
+
+    `events` holds (tick, direction) pairs in tick order; the direction
+    applies from that tick's step onwards.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        grid_w: int,
+        grid_h: int,
+        mode: str = "Classic",
+        events=None,
+        ticks: int = 0,
+        score: int = 0,
+        outcome: str = "unfinished",
+    ):
+        self.seed = seed
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.mode = mode
+        self.events = list(events or [])
+        self.ticks = ticks
+        self.score = score
+        self.outcome = outcome
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                MODES.index(self.mode),
+                OUTCOMES.index(self.outcome),
+                self.grid_w,
+                self.grid_h,
+                self.seed,
+            )
+        )
+        _write_varint(out, self.ticks)
+        _write_varint(out, self.score)
+        _write_varint(out, len(self.events))
+        last = 0
+        for tick, direction in self.events:
+            _write_varint(out, ((tick - last) << 2) | DIRECTION_CODES[direction])
+            last = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        magic, version, mode, outcome, grid_w, grid_h, seed = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a replay file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        pos = _HEADER.size
+        ticks, pos = _read_varint(data, pos)
+        score, pos = _read_varint(data, pos)
+        n_events, pos = _read_varint(data, pos)
+        events = []
+        tick = 0
+        for _ in range(n_events):
+            v, pos = _read_varint(data, pos)
+            tick += v >> 2
+            events.append((tick, DIRECTIONS[v & 3]))
+        return cls(seed, grid_w, grid_h, MODES[mode], events, ticks, score, OUTCOMES[outcome])
+
+    def save(self, path) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> "Replay":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Builds a Replay while a game is played.
+
+    Call tick(snake) right before every snake.step(); it logs the direction
+    the step is about to use whenever it differs from the previous one.
+    """
+
+    def __init__(self, snake: Snake):
+        if snake.seed is None:
+            raise ValueError("Recording a replay needs a Snake created with seed=")
+        self.replay = Replay(snake.seed, snake.grid_w, snake.grid_h, snake.mode)
+        self._direction = snake.direction
+
+    def tick(self, snake: Snake) -> None:
+        if snake.direction != self._direction:
+            self._direction = snake.direction
+            self.replay.events.append((self.replay.ticks, snake.direction))
+        self.replay.ticks += 1
+
+    def finish(self, snake: Snake, outcome: str) -> Replay:
+        self.replay.score = len(snake.segments) - 1
+        self.replay.outcome = outcome
+        return self.replay
+
+
+def run_replay(replay: Replay):
+    """Re-simulate one replay. Returns (score, ticks, outcome)."""
+    snake = Snake(replay.grid_w, replay.grid_h, mode=replay.mode, seed=replay.seed)
+    events = replay.events
+    n_events = len(events)
+    e = 0
+    outcome = "unfinished"
+    ticks = 0
+    step = snake.step
+    while ticks < replay.ticks:
+        while e < n_events and events[e][0] == ticks:
+            # Recorded directions are the effective ones, so set them as-is
+            snake.direction = events[e][1]
+            e += 1
+        ate, died, won = step()
+        ticks += 1
+        if died or won:
+            outcome = "died" if died else "won"
+            break
+    return len(snake.segments) - 1, ticks, outcome
+
+
+def verify_replays(replays):
+    """Re-simulate many replays, lockstepped per board setup with BatchSnake.
+
+    Board setups with fewer than MIN_BATCH replays are run with run_replay.
+    Returns one (score, ticks, outcome, valid) tuple per replay, in order;
+    `valid` means the re-simulation matches the replay's claimed result.
+    """
+    results = [None] * len(replays)
+    groups = {}
+    for i, r in enumerate(replays):
+        groups.setdefault((r.grid_w, r.grid_h, r.mode), []).append(i)
+
+    for (grid_w, grid_h, mode), idxs in groups.items():
+        if len(idxs) < MIN_BATCH:
+            for i in idxs:
+                r = replays[i]
+                res = run_replay(r)
+                results[i] = res + (res == (r.score, r.ticks, r.outcome),)
+            continue
+        group = [replays[i] for i in idxs]
+        n = len(group)
+        batch = BatchSnake(n, grid_w, grid_h, mode, seeds=[r.seed for r in group])
+        limit = np.array([r.ticks for r in group], dtype=np.int64)
+        ticks = np.zeros(n, dtype=np.int64)
+        outcome = np.zeros(n, dtype=np.int8)  # index into OUTCOMES
+
+        # All direction events of the group, sorted by tick
+        ev_board = np.array([b for b, r in enumerate(group) for _ in r.events], dtype=np.int64)
+        ev_tick = np.array([t for r in group for t, _ in r.events], dtype=np.int64)
+        ev_dir = np.array([d for r in group for _, d in r.events], dtype=np.int32).reshape(-1, 2)
+        order = np.argsort(ev_tick, kind="stable")
+        ev_board, ev_tick, ev_dir = ev_board[order], ev_tick[order], ev_dir[order]
+        max_ticks = int(limit.max()) if n else 0
+        bounds = np.searchsorted(ev_tick, np.arange(max_ticks + 1))
+
+        batch.done |= limit == 0
+        for t in range(max_ticks):
+            lo, hi = bounds[t], bounds[t + 1]
+            if lo != hi:
+                b = ev_board[lo:hi]
+                batch.dx[b] = ev_dir[lo:hi, 0]
+                batch.dy[b] = ev_dir[lo:hi, 1]
+            live = ~batch.done
+            ate, died, won = batch.step()
+            ticks[live] += 1
+            outcome[died] = 1
+            outcome[won] = 2
+            batch.done |= ticks >= limit
+            if batch.done.all():
+                break
+
+        scores = batch.scores()
+        for b, i in enumerate(idxs):
+            r = replays[i]
+            res = (int(scores[b]), int(ticks[b]), OUTCOMES[outcome[b]])
+            results[i] = res + (res == (r.score, r.ticks, r.outcome),)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify Snake replay files.")
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    replays = [Replay.load(path) for path in args.files]
+    start = time.perf_counter()
+    results = verify_replays(replays)
+    elapsed = time.perf_counter() - start
+
+    for path, (score, ticks, outcome, valid) in zip(args.files, results):
+        status = "OK" if valid else "MISMATCH"
+        print(f"{status:8} {path}: score={score} ticks={ticks} outcome={outcome}")
+    total = sum(r[1] for r in results)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"{len(results)} replays, {total} ticks in {elapsed:.3f}s ({rate:,.0f} ticks/sec)")
+
+
+if __name__ == "__main__":
+    main()
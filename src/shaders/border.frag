@@ -0,0 +1,29 @@
+#version 330
+
+in vec2 v_cell;
+flat in int v_layer;
+out vec4 f_color;
+
+uniform ivec2 u_resolution; // grid cell counts
+uniform float u_padding; // inner padding inside each cell (0..1 fraction of cell)
+uniform int u_layer_thickness[4]; // rings covered by each layer, bottom layer first
+uniform vec4 u_layer_colors[4];
+
+void main() {
+    // Procedural version of one padded quad per border cell, so the border
+    // costs a single draw no matter how large the board is. Instances are
+    // rasterized in order, so each layer blends over the ones before it.
+    ivec2 cell = ivec2(floor(v_cell));
+    ivec2 far = u_resolution - 1 - cell;
+    int depth = min(min(cell.x, cell.y), min(far.x, far.y));
+    if (depth >= u_layer_thickness[v_layer]) {
+        discard;
+    }
+
+    vec2 f = fract(v_cell);
+    if (any(lessThan(f, vec2(u_padding))) || any(greaterThan(f, vec2(1.0 - u_padding)))) {
+        discard;
+    }
+
+    f_color = u_layer_colors[v_layer];
+}
@@ -0,0 +1,25 @@
+#version 330
+
+in vec2 in_vert;     // corner in [0,1], spans the whole board
+
+uniform ivec2 u_resolution; // grid cell counts
+uniform vec2 u_screen; // screen size in pixels
+
+out vec2 v_cell; // position in grid cells
+flat out int v_layer; // one instance per border layer
+
+void main() {
+    // same board placement as quad.vert: square cells, board centered
+    float cell = min(u_screen.x / float(u_resolution.x), u_screen.y / float(u_resolution.y));
+    vec2 board_px = vec2(cell) * vec2(u_resolution);
+    vec2 offset = (u_screen - board_px) * 0.5;
+
+    v_cell = in_vert * vec2(u_resolution);
+    v_layer = gl_InstanceID;
+    vec2 pos_px = offset + in_vert * board_px;
+
+    // to NDC
+    vec2 ndc = (pos_px / u_screen) * 2.0 - 1.0;
+    ndc.y = -ndc.y;
+    gl_Position = vec4(ndc, 0.0, 1.0);
+}
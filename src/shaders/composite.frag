@@ -1,4 +1,6 @@
 #version 330
+// Built a second time with CHROMA defined as the fused composite +
+// chromatic aberration pass, see Renderer.__init__.
 in vec2 v_uv;
 uniform sampler2D scene;
 uniform sampler2D bloom;
@@ -7,6 +9,10 @@ uniform float strength;
 uniform float exposure;
 uniform float dirt_strength; // 0..1
 uniform int has_dirt; // 0/1
+#ifdef CHROMA
+uniform float u_amount;     // Intensity of the effect
+uniform float u_center_bias; // How much to keep the center clean (0.0=off, 1.0=full)
+#endif
 out vec4 f_color;
 
 // ACES-ish curve helpers
@@ -22,21 +28,40 @@ vec3 ACESFilm(vec3 color) {
     return clamp(pow(color, vec3(1.0 / 2.2)), 0.0, 1.0);
 }
 
-void main() {
-    vec3 s = texture(scene, v_uv).rgb;
-    vec3 b = texture(bloom, v_uv).rgb;
+vec3 scene_hdr(vec2 uv) {
+    vec3 s = texture(scene, uv).rgb;
+    vec3 b = texture(bloom, uv).rgb;
 
     // apply dirt map if available
     if (has_dirt == 1) {
-        vec3 d = texture(dirt, v_uv).rgb;
+        vec3 d = texture(dirt, uv).rgb;
             // use luminance of dirt to modulate bloom intensity while preserving color
             float d_lum = max(max(d.r, d.g), d.b);
             b *= mix(vec3(1.0), vec3(d_lum), dirt_strength);
     }
 
-    vec3 hdr = s + b * strength;
+    return s + b * strength;
+}
+
+void main() {
+#ifdef CHROMA
+    // same offsets as chroma_aberration.frag; the tonemap works per channel,
+    // so composing each channel at its own UV matches the two-pass result
+    // without the intermediate full-screen target
+    vec2 delta_uv = v_uv - vec2(0.5, 0.5);
+    float d2 = dot(delta_uv, delta_uv);
+    float aberration_amount = u_amount * (1.0 - u_center_bias) + (u_amount * u_center_bias * d2);
+    vec2 offset = delta_uv * aberration_amount;
+    vec3 hdr = vec3(
+        scene_hdr(v_uv - offset).r,
+        scene_hdr(v_uv).g,
+        scene_hdr(v_uv + offset).b
+    );
+#else
+    vec3 hdr = scene_hdr(v_uv);
+#endif
     hdr *= exposure;
 
     vec3 mapped = ACESFilm(hdr);
     f_color = vec4(mapped, 1.0);
-}
\ No newline at end of file
+}
@@ -0,0 +1,23 @@
+#version 330
+in vec2 v_uv;
+uniform sampler2D tex; // the larger level being reduced
+uniform float offset;
+uniform vec2 texel; // 1/width, 1/height of tex
+out vec4 f_color;
+
+// clamp taps inside the texture so small mips do not wrap glow around edges
+vec3 tap(vec2 uv) {
+    return texture(tex, clamp(uv, texel * 0.5, 1.0 - texel * 0.5)).rgb;
+}
+
+void main() {
+    // dual-filter downsample: center plus four half-texel diagonals, each
+    // bilinear fetch averaging a 2x2 block of the source
+    vec2 h = texel * 0.5 * offset;
+    vec3 sum = tap(v_uv) * 4.0;
+    sum += tap(v_uv + vec2( h.x,  h.y));
+    sum += tap(v_uv + vec2( h.x, -h.y));
+    sum += tap(v_uv + vec2(-h.x,  h.y));
+    sum += tap(v_uv + vec2(-h.x, -h.y));
+    f_color = vec4(sum / 8.0, 1.0);
+}
@@ -0,0 +1,26 @@
+#version 330
+in vec2 v_uv;
+uniform sampler2D tex; // the smaller level being expanded
+uniform float offset;
+uniform vec2 texel; // 1/width, 1/height of tex
+out vec4 f_color;
+
+// clamp taps inside the texture so small mips do not wrap glow around edges
+vec3 tap(vec2 uv) {
+    return texture(tex, clamp(uv, texel * 0.5, 1.0 - texel * 0.5)).rgb;
+}
+
+void main() {
+    // dual-filter upsample: a tent of four edge taps and four diagonals
+    vec2 h = texel * 0.5 * offset;
+    vec3 sum = vec3(0.0);
+    sum += tap(v_uv + vec2(-h.x * 2.0, 0.0));
+    sum += tap(v_uv + vec2( h.x * 2.0, 0.0));
+    sum += tap(v_uv + vec2(0.0, -h.y * 2.0));
+    sum += tap(v_uv + vec2(0.0,  h.y * 2.0));
+    sum += tap(v_uv + vec2(-h.x,  h.y)) * 2.0;
+    sum += tap(v_uv + vec2( h.x,  h.y)) * 2.0;
+    sum += tap(v_uv + vec2(-h.x, -h.y)) * 2.0;
+    sum += tap(v_uv + vec2( h.x, -h.y)) * 2.0;
+    f_color = vec4(sum / 12.0, 1.0);
+}
@@ -1,9 +1,16 @@
 #version 330
 
-out vec4 f_color;
-uniform vec4 u_color;
+in vec4 v_color;
+in vec3 v_bloom;
+
+layout(location = 0) out vec4 f_color; // scene (LDR)
+layout(location = 1) out vec4 f_bloom; // bloom mask (HDR)
 
 void main() {
-    // simple solid color segments
-    f_color = u_color;
+    // simple solid color segments, color picked per instance in quad.vert.
+    // Drawn with blend (ONE, ONE_MINUS_SRC_ALPHA) on color and (SRC_ALPHA,
+    // ONE_MINUS_SRC_ALPHA) on alpha: the premultiplied scene color
+    // alpha-blends, the zero-alpha bloom color adds up.
+    f_color = vec4(v_color.rgb * v_color.a, v_color.a);
+    f_bloom = vec4(v_bloom, 0.0);
 }
\ No newline at end of file
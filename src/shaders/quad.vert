@@ -2,12 +2,30 @@
 
 in vec2 in_vert;     // corner in [0,1]
 in vec2 in_offset;   // instance offset in grid coords
+in vec2 in_prev_offset; // where the instance was on the previous tick
+in float in_palette; // instance index into u_palette
 
 uniform ivec2 u_resolution; // grid cell counts
 uniform vec2 u_screen; // screen size in pixels
 uniform float u_padding; // inner padding inside each cell (0..1 fraction of cell)
+uniform vec4 u_palette[8]; // per-kind cell colors (snake, apple, obstacle, ...)
+uniform vec3 u_bloom_palette[8]; // HDR bloom color per palette entry
+uniform float u_jitter[8]; // screen-shake amplitude in cells per palette entry (0 = off)
+uniform float u_jitter_seed; // changes every frame so the shake moves
+uniform float u_alpha; // progress from in_prev_offset (0) to in_offset (1)
+
+float hash(float n) {
+    return fract(sin(n) * 43758.5453);
+}
+
+out vec4 v_color;
+out vec3 v_bloom;
 
 void main() {
+    int pal = int(in_palette + 0.5);
+    v_color = u_palette[pal];
+    v_bloom = u_bloom_palette[pal];
+
     // compute square cell size (in pixels) so grid preserves aspect ratio
     float cell_w = u_screen.x / float(u_resolution.x);
     float cell_h = u_screen.y / float(u_resolution.y);
@@ -21,8 +39,16 @@ void main() {
     // padding in pixels
     vec2 pad = cell_px * u_padding;
 
+    // per-instance shake, uniform in [-u_jitter, u_jitter] on each axis
+    float id = float(gl_InstanceID);
+    vec2 jitter = vec2(
+        hash(id * 12.9898 + u_jitter_seed),
+        hash(id * 78.233 + u_jitter_seed + 17.0)
+    ) * 2.0 - 1.0;
+
     // position in pixels (top-left origin)
-    vec2 pos_px = offset + (in_offset + in_vert) * cell_px;
+    vec2 cell_pos = mix(in_prev_offset, in_offset, u_alpha);
+    vec2 pos_px = offset + (cell_pos + jitter * u_jitter[pal] + in_vert) * cell_px;
 
     // apply padding: shrink the quad toward its center by pad
     // in_vert in {0,1} - move corners inward/outward appropriately
@@ -1,22 +1,24 @@
 #version 330
-in vec2 in_pos;
-in vec2 in_uv;
+in vec2 in_vert;   // corner in [0,1]
+in vec4 in_rect;   // instance: top-left x, y and w, h in pixels
+in vec4 in_color;
+in float in_radius;
 
-out vec2 v_uv; // Normalized UV (0..1)
-out vec2 v_local_pos; // Local pixel position (0..size)
+out vec2 v_local_pos; // Local pixel position (0..size), y up
+flat out vec2 v_size;
+flat out vec4 v_color;
+flat out float v_radius;
 
 uniform vec2 u_screen;
-uniform vec2 u_rect_pos; // Pixel coordinates of the top-left corner
-uniform vec2 u_rect_size; // Pixel size of the rectangle
 
 void main() {
-    v_uv = in_uv;
-    
-    // Calculate local pixel position: (in_pos - u_rect_pos)
-    // Note: in_pos is already derived from the quad array (x, y, x+w, y+h)
-    v_local_pos = vec2(in_pos.x - u_rect_pos.x, u_rect_pos.y + u_rect_size.y - in_pos.y);
-    
+    vec2 pos = in_rect.xy + in_vert * in_rect.zw;
+    v_local_pos = vec2(in_vert.x, 1.0 - in_vert.y) * in_rect.zw;
+    v_size = in_rect.zw;
+    v_color = in_color;
+    v_radius = in_radius;
+
     // Convert from pixel coords to clip space
-    vec2 p = (in_pos / u_screen) * 2.0 - 1.0;
+    vec2 p = (pos / u_screen) * 2.0 - 1.0;
     gl_Position = vec4(p.x, -p.y, 0.0, 1.0); // flip Y
 }
\ No newline at end of file
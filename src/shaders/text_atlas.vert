@@ -0,0 +1,16 @@
+#version 330
+in vec2 in_vert;      // corner in [0,1]
+in vec4 in_rect;      // glyph quad in pixels: x, y (top-left), w, h
+in vec4 in_uv_rect;   // glyph in the atlas: u0, v0, u1, v1
+in vec4 in_color;
+uniform vec2 u_screen;
+out vec2 v_uv;
+out vec4 v_color;
+void main() {
+    vec2 pos = in_rect.xy + in_vert * in_rect.zw;
+    vec2 ndc = (pos / u_screen) * 2.0 - 1.0;
+    ndc.y = -ndc.y;
+    gl_Position = vec4(ndc, 0.0, 1.0);
+    v_uv = mix(in_uv_rect.xy, in_uv_rect.zw, in_vert);
+    v_color = in_color;
+}
\ No newline at end of file
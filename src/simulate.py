@@ -0,0 +1,191 @@
+"""Headless game simulation.
+
+Plays games using only the rules in game.py: no pygame, moderngl, window or
+audio is touched, so this runs on render-less servers and starts instantly.
+
+    python -m src.simulate --games 1000 --policy greedy
+    python -m src.simulate --policy my_bots:wall_hugger --mode Arcade
+
+A policy is any callable ``policy(snake, rng)`` returning a direction tuple
+(or None to keep going straight). It is called once before every tick.
+"""
+import argparse
+import importlib
+import random
+import statistics
+import time
+
+from .game import DIRECTIONS, Snake
+
+
+# -----------------------
+# BUILT-IN POLICIES
+# -----------------------
+def straight_policy(snake, rng):
+    return None
+
+
+def random_policy(snake, rng):
+    # Turn now and then, like the menu preview snake
+    if rng.random() < 0.1:
+        return rng.choice(DIRECTIONS)
+    return None
+
+
+def _safe_moves(snake):
+    head = snake.segments[-1]
+    cur = snake.direction
+    moves = []
+    for d in DIRECTIONS:
+        if d[0] == -cur[0] and d[1] == -cur[1]:
+            continue
+        p = ((head[0] + d[0]) % snake.grid_w, (head[1] + d[1]) % snake.grid_h)
+        if snake.is_free(p):
+            moves.append((d, p))
+    return moves
+
+
+def _wrap_dist(a, b, size):
+    d = abs(a - b)
+    return min(d, size - d)
+
+
+def greedy_policy(snake, rng):
+    """Step towards the apple (with wraparound) without walking into anything."""
+    moves = _safe_moves(snake)
+    if not moves:
+        return None
+    ax, ay = snake.apple
+
+    def dist(move):
+        _, p = move
+        return _wrap_dist(p[0], ax, snake.grid_w) + _wrap_dist(p[1], ay, snake.grid_h)
+
+    best = min(dist(m) for m in moves)
+    return rng.choice([d for d, p in moves if dist((d, p)) == best])
+
+
+POLICIES = {
+    "straight": straight_policy,
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+
+def load_policy(name: str):
+    """Resolve a built-in policy name or a ``module:function`` path."""
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(
+            f"Unknown policy {name!r}; use one of {', '.join(POLICIES)} or module:function"
+        )
+    return getattr(importlib.import_module(module_name), attr)
+
+
+# -----------------------
+# SIMULATION
+# -----------------------
+def run_game(policy, grid_w: int, grid_h: int, mode: str, seed: int, max_ticks: int):
+    """Play one game. Returns (score, ticks, outcome) with outcome in died/won/timeout."""
+    rng = random.Random(seed ^ 0x5EED)
+    snake = Snake(grid_w, grid_h, mode=mode, seed=seed)
+    outcome = "timeout"
+    ticks = 0
+    while ticks < max_ticks:
+        new_dir = policy(snake, rng)
+        if new_dir is not None:
+            snake.change_dir(new_dir)
+        ate, died, won = snake.step()
+        ticks += 1
+        if died:
+            outcome = "died"
+            break
+        if won:
+            outcome = "won"
+            break
+    return len(snake.segments) - 1, ticks, outcome
+
+
+def simulate(
+    games: int,
+    policy,
+    grid_w: int = 24,
+    grid_h: int = 24,
+    mode: str = "Classic",
+    seed: int = 0,
+    max_ticks: int = 100_000,
+):
+    """Run `games` games and return a summary dict."""
+    scores = []
+    outcomes = {"died": 0, "won": 0, "timeout": 0}
+    total_ticks = 0
+    start = time.perf_counter()
+    for i in range(games):
+        score, ticks, outcome = run_game(policy, grid_w, grid_h, mode, seed + i, max_ticks)
+        scores.append(score)
+        outcomes[outcome] += 1
+        total_ticks += ticks
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "ticks": total_ticks,
+        "seconds": elapsed,
+        "ticks_per_sec": total_ticks / elapsed if elapsed > 0 else 0.0,
+        "outcomes": outcomes,
+        "scores": scores,
+    }
+
+
+def format_summary(summary) -> str:
+    scores = sorted(summary["scores"])
+    lines = [
+        f"games:      {summary['games']}",
+        f"ticks:      {summary['ticks']}",
+        f"time:       {summary['seconds']:.3f}s",
+        f"ticks/sec:  {summary['ticks_per_sec']:,.0f}",
+        "outcomes:   " + ", ".join(f"{k}={v}" for k, v in summary["outcomes"].items()),
+    ]
+    if scores:
+        lines.append(
+            f"score:      min={scores[0]} mean={statistics.fmean(scores):.2f} "
+            f"median={statistics.median(scores)} max={scores[-1]}"
+        )
+        if len(scores) > 1:
+            deciles = statistics.quantiles(scores, n=10)
+            lines.append(
+                "deciles:    " + " ".join(f"{q:g}" for q in deciles)
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Snake simulations.")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument(
+        "--policy",
+        default="greedy",
+        help=f"built-in policy ({', '.join(POLICIES)}) or module:function",
+    )
+    parser.add_argument("--grid", type=int, nargs=2, default=(24, 24), metavar=("W", "H"))
+    parser.add_argument("--mode", default="Classic", choices=["Classic", "Arcade"])
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int, default=100_000, help="per-game tick cap")
+    args = parser.parse_args(argv)
+
+    summary = simulate(
+        args.games,
+        load_policy(args.policy),
+        grid_w=args.grid[0],
+        grid_h=args.grid[1],
+        mode=args.mode,
+        seed=args.seed,
+        max_ticks=args.max_ticks,
+    )
+    print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()